@@ -0,0 +1 @@
+from standards.asgi import app  # noqa
@@ -5,5 +5,15 @@ app = Flask(__name__)
 app.config.from_object("standards.config.Config")
 dictConfig(app.config.get('LOGGING_CONFIG', {}))
 
+from standards.api import codec  # noqa
+codec.select(app.config['JSON_CODEC'])
+app.json_encoder = codec.JSONEncoder
+app.json_decoder = codec.JSONDecoder
+
 from standards.api import api_bp  # noqa
 app.register_blueprint(api_bp, url_prefix='/api/')
+
+from standards.api.registry import load_registry  # noqa
+from standards.api.warmup import start_warmup  # noqa
+load_registry()
+refresher = start_warmup()
@@ -0,0 +1,207 @@
+import asyncio
+import json
+
+import httpx
+
+from standards import app
+from standards.api.cache import CachedResponse, ResponseCache
+from standards.api.client import CircuitOpenError, UpstreamClient
+from standards.api.utils import (
+    get_context_url_from_request_body,
+    get_schema_url_from_context,
+    get_terms,
+    get_validator,
+    memoized_result,
+    response_cache,
+    upstream
+)
+from standards.errors import BadRequestException, ServiceUnavailableException
+
+
+class AsyncUpstreamClient:
+    """Non-blocking counterpart of ``UpstreamClient`` built on ``httpx.AsyncClient``.
+
+    Timeouts, retries, backoff and the per-host circuit breakers are shared with
+    the synchronous client. Admission control is the connection pool itself:
+    callers queue for one of ``pool_size`` connections for at most
+    ``queue_timeout`` seconds.
+
+        Args:
+            client (UpstreamClient): Client whose settings and breakers are reused.
+            queue_timeout (float): Seconds to wait for a pooled connection.
+    """
+    def __init__(self, client: UpstreamClient, queue_timeout=2.0):
+        self.sync_client = client
+        self.queue_timeout = queue_timeout
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            connect_timeout, read_timeout = self.sync_client.timeout
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout, pool=self.queue_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.sync_client.pool_size,
+                    max_keepalive_connections=self.sync_client.pool_size)
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        breaker = self.sync_client.breaker(url) if self.sync_client.breaker_threshold else None
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError(f'Circuit for {url} is open')
+        try:
+            response = await self._request(method, url, **kwargs)
+        except (httpx.PoolTimeout, asyncio.CancelledError):
+            # waiting for a connection or being cancelled says nothing about the host's health
+            if breaker is not None:
+                breaker.release()
+            raise
+        except Exception:
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+        if breaker is not None:
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        return response
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        client = self.sync_client
+        idempotent = method.upper() in client.IDEMPOTENT_METHODS
+        attempts = client.retries + 1 if idempotent else 1
+
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except httpx.PoolTimeout:
+                raise
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+            else:
+                if last_attempt or response.status_code not in client.RETRY_STATUSES:
+                    return response
+                await response.aclose()
+            await asyncio.sleep(client.backoff_delay(attempt))
+
+
+async def make_request(method: str, url: str, **kwargs) -> httpx.Response:
+    try:
+        response = await async_upstream.request(method, url, **kwargs)
+        if response.status_code >= 400:
+            response.raise_for_status()
+    except httpx.HTTPStatusError as http_e:
+        app.logger.error(http_e)
+        raise BadRequestException(f"Nothing matches the given URI: {str(http_e.request.url)}") from http_e
+    except httpx.PoolTimeout as e:
+        app.logger.warning(f'No upstream connection within {async_upstream.queue_timeout}s for {url}')
+        raise ServiceUnavailableException(retry_after=app.config['UPSTREAM_RETRY_AFTER']) from e
+    except CircuitOpenError as e:
+        app.logger.debug(e)
+        raise BadRequestException(f"Nothing matches the given URI: {url}") from e
+    except Exception as e:
+        app.logger.error(e)
+        raise BadRequestException(f"Nothing matches the given URI: {url}") from e
+    else:
+        return response
+
+
+class AsyncResponseCache:
+    """Awaitable front of a ``ResponseCache``, sharing its entries, pins and
+    remembered failures. Concurrent fetches of one url are coalesced per loop."""
+    def __init__(self, cache: ResponseCache):
+        self.cache = cache
+        self._inflight = {}
+
+    async def fetch(self, url: str) -> CachedResponse:
+        entry = self.cache.lookup(url)
+        if entry is not None:
+            return entry
+
+        future = self._inflight.get(url)
+        if future is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+            # the fetch was cancelled with the caller that started it, not this one
+            return await self.fetch(url)
+
+        future = self._inflight[url] = asyncio.get_running_loop().create_future()
+        try:
+            entry = await self._fetch(url)
+        except Exception as e:
+            self.cache.record_failure(url, e)
+            future.set_exception(e)
+            # mark as retrieved, the exception is re-raised to this caller below
+            future.exception()
+            raise
+        except BaseException:
+            # cancelled, the waiting callers start their own fetch
+            future.cancel()
+            raise
+        else:
+            future.set_result(entry)
+            return entry
+        finally:
+            del self._inflight[url]
+
+    async def _fetch(self, url: str) -> CachedResponse:
+        # both may wait on the shared SQLite store, which must not block the loop
+        loop = asyncio.get_running_loop()
+        entry = await loop.run_in_executor(None, self.cache.stale_entry, url)
+        if entry is not None and entry.is_fresh:
+            return entry
+        response = await make_request('GET', url, headers=self.cache.conditional_headers(entry))
+        return await loop.run_in_executor(None, self.cache.update, url, entry, response)
+
+
+async def get_context(url: str) -> json:
+    try:
+        context = (await async_response_cache.fetch(url)).data
+    except (ValueError, AttributeError) as e:
+        app.logger.exception(
+            f'The response body does not contain valid json: {e}')
+    else:
+        return context
+
+
+async def get_schema(url: str) -> json:
+    try:
+        schema = (await async_response_cache.fetch(url)).data
+    except (ValueError, AttributeError) as e:
+        app.logger.exception(
+            f'The response body does not contain valid json: {e}')
+    else:
+        return schema
+
+
+async def validate_data(data: json, max_errors: int = None) -> dict:
+    # get context
+    context_url = get_context_url_from_request_body(data)
+    context = await get_context(context_url)
+
+    # get schema
+    schema_url = get_schema_url_from_context(context)
+    schema = await get_schema(schema_url)
+
+    v = get_validator(schema_url, schema)
+    digest = response_cache.digest(schema_url, schema)
+    terms = get_terms(context_url, context) if app.config['TERM_CHECK'] else None
+
+    return memoized_result(digest=digest, validator=v, data=data, max_errors=max_errors, terms=terms)
+
+
+async_upstream = AsyncUpstreamClient(upstream, queue_timeout=app.config['UPSTREAM_QUEUE_TIMEOUT'])
+async_response_cache = AsyncResponseCache(response_cache)
@@ -0,0 +1,193 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from jsonschema import Draft7Validator
+
+from standards import app
+from standards.api import codec
+from standards.api.cache import LRUCache
+from standards.api.terms import ContextTerms
+from standards.api.utils import (
+    get_context_url_from_request_body,
+    get_validator,
+    new_validator,
+    resolve_schema,
+    resolve_terms,
+    response_cache,
+    validation_result
+)
+from standards.errors import UnprocessableEntityException
+from standards.errors.errors import BaseException as APIException
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+# validators compiled inside pool processes, keyed by schema digest
+_worker_validators = LRUCache(maxsize=32)
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Return this process' validation pool, creating it after start or fork."""
+    global _pool, _pool_pid
+    if _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool_pid != os.getpid():
+                # fork keeps the loaded ontology and imports, spawning would reload them
+                _pool = ProcessPoolExecutor(
+                    max_workers=app.config['BATCH_PROCESSES'],
+                    mp_context=multiprocessing.get_context('fork'))
+                _pool_pid = os.getpid()
+    return _pool
+
+
+def reset_pool():
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=False)
+        _pool = _pool_pid = None
+
+
+def item_result(validator: Draft7Validator, data, max_errors: int = None, terms: ContextTerms = None) -> dict:
+    try:
+        return validation_result(validator=validator, data=data, max_errors=max_errors, terms=terms)
+    except UnprocessableEntityException as e:
+        return e.to_dict()
+
+
+def validate_chunk(schema: dict, digest: str, documents: list, max_errors: int = None,
+                   terms: ContextTerms = None) -> list:
+    """Validate documents against one schema, runs inside a pool process."""
+    validator = _worker_validators.get_or_set(digest, lambda: new_validator(schema))
+    return [item_result(validator, document, max_errors, terms) for document in documents]
+
+
+def validate_batch(documents: list, max_errors: int = None) -> list:
+    """Validate many documents, resolving each distinct ``@context`` once.
+
+        Args:
+            documents (List[dict]): DataExamples to validate.
+            max_errors (int): Error limit per document, see ``get_max_errors``.
+        Returns:
+            results (List[dict]): Per document, in request order, ``{'isValid': 'True'}``
+                or the error body ``/api/validate`` would answer with.
+    """
+    results = [None] * len(documents)
+
+    groups = {}
+    for index, document in enumerate(documents):
+        try:
+            context_url = get_context_url_from_request_body(document)
+        except APIException as e:
+            results[index] = e.to_dict()
+        else:
+            groups.setdefault(context_url, []).append(index)
+
+    resolved = []
+    for context_url, indexes in groups.items():
+        try:
+            schema_url, schema = resolve_schema(context_url)
+            validator = get_validator(schema_url, schema)
+            terms = resolve_terms(context_url)
+        except APIException as e:
+            for index in indexes:
+                results[index] = e.to_dict()
+        else:
+            resolved.append((schema_url, schema, validator, terms, indexes))
+
+    pending = sum(len(indexes) for *_, indexes in resolved)
+    if app.config['BATCH_PROCESSES'] and pending >= app.config['BATCH_POOL_MIN_ITEMS']:
+        futures = []
+        chunk_size = app.config['BATCH_CHUNK_SIZE']
+        for schema_url, schema, validator, terms, indexes in resolved:
+            digest = response_cache.digest(schema_url, schema)
+            for start in range(0, len(indexes), chunk_size):
+                chunk = indexes[start:start + chunk_size]
+                future = get_pool().submit(
+                    validate_chunk, schema, digest, [documents[i] for i in chunk], max_errors, terms)
+                futures.append((validator, terms, chunk, future))
+        for validator, terms, chunk, future in futures:
+            try:
+                chunk_results = future.result()
+            except BrokenProcessPool as e:
+                app.logger.error(f'Validation pool failed, validating in process: {e}')
+                reset_pool()
+                chunk_results = [item_result(validator, documents[i], max_errors, terms) for i in chunk]
+            for index, result in zip(chunk, chunk_results):
+                results[index] = result
+    else:
+        for schema_url, schema, validator, terms, indexes in resolved:
+            for index in indexes:
+                results[index] = item_result(validator, documents[index], max_errors, terms)
+
+    return results
+
+
+def iter_ndjson_lines(stream, max_line_bytes: int):
+    """Yield the non-blank lines of a binary stream one at a time, or ``None`` in
+    place of a line longer than ``max_line_bytes``, which is skipped unread."""
+    while True:
+        line = stream.readline(max_line_bytes + 1)
+        if not line:
+            return
+        if len(line) > max_line_bytes and not line.endswith(b'\n'):
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(max_line_bytes)
+            yield None
+        elif line.strip():
+            yield line
+
+
+def iter_ndjson_documents(stream, max_line_bytes: int):
+    """Yield the documents of an NDJSON body as they are read. A malformed line raises
+    ``ValueError``, a line longer than ``max_line_bytes`` ``UnprocessableEntityException``."""
+    for line in iter_ndjson_lines(stream, max_line_bytes):
+        if line is None:
+            raise UnprocessableEntityException(f'A document can be at most {max_line_bytes} bytes long.')
+        yield codec.loads(line)
+
+
+def validate_stream(lines, max_line_bytes: int, max_errors: int = None):
+    """Validate NDJSON documents as they are read, yielding one result per line.
+
+        Args:
+            lines (Iterable[bytes]): Lines from ``iter_ndjson_lines``.
+            max_line_bytes (int): Line limit, used in the error of skipped lines.
+            max_errors (int): Error limit per document, see ``get_max_errors``.
+        Returns:
+            results (Iterator[dict]): Same results as ``validate_batch``.
+    """
+    # resolved validators and terms, or the error resolving them, by @context url
+    resolved = LRUCache(maxsize=64)
+
+    for line in lines:
+        if line is None:
+            yield UnprocessableEntityException(
+                f'A document can be at most {max_line_bytes} bytes long.').to_dict()
+            continue
+        try:
+            document = codec.loads(line)
+            context_url = get_context_url_from_request_body(document)
+        except ValueError:
+            yield UnprocessableEntityException().to_dict()
+            continue
+        except APIException as e:
+            yield e.to_dict()
+            continue
+
+        checks = resolved.get(context_url)
+        if checks is None:
+            try:
+                checks = (get_validator(*resolve_schema(context_url)), resolve_terms(context_url))
+            except APIException as e:
+                checks = e
+            resolved.set(context_url, checks)
+
+        if isinstance(checks, APIException):
+            yield checks.to_dict()
+        else:
+            yield item_result(checks[0], document, max_errors, checks[1])
@@ -0,0 +1,467 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+
+
+class LRUCache:
+    """Bounded, thread-safe mapping with least-recently-used and TTL eviction.
+
+        Args:
+            maxsize (int): Maximum number of entries kept in the cache.
+            ttl (float): Seconds an entry stays valid, ``None`` disables expiry.
+            max_bytes (int): Budget for the sizes passed to ``set``, ``None``
+                bounds the cache by ``maxsize`` only.
+    """
+    def __init__(self, maxsize=128, ttl=None, max_bytes=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.RLock()
+        self._building = SingleFlight()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._lookup(key)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def _lookup(self, key):
+        try:
+            expires, value = self._data[key]
+        except KeyError:
+            return _MISSING
+        if expires is not None and expires <= time.monotonic():
+            self._remove(key)
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def peek(self, key, default=None):
+        """Return value for key without touching recency, expiry or counters."""
+        entry = self._data.get(key)
+        return default if entry is None else entry[1]
+
+    def set(self, key, value, ttl=None, size=0):
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._data[key] = (expires, value)
+            if size:
+                self._sizes[key] = size
+                self.bytes += size
+            while len(self._data) > self.maxsize or (self.max_bytes is not None and self.bytes > self.max_bytes):
+                self._remove(next(iter(self._data)))
+
+    def get_or_set(self, key, factory):
+        """Return cached value for key, building it with ``factory()`` on a miss.
+
+        The value is built without holding the lock, so lookups of other keys go on
+        meanwhile; concurrent misses for the same key wait for a single build.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._building.do(key, self._build, key, factory)
+        return value
+
+    def _build(self, key, factory):
+        # a build that finished after our miss has already set the value
+        with self._lock:
+            value = self._lookup(key)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._remove(key)
+        return default if entry is None else entry[1]
+
+    def _remove(self, key):
+        entry = self._data.pop(key, None)
+        self.bytes -= self._sizes.pop(key, 0)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.bytes = self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+            if self.max_bytes is not None:
+                stats['bytes'] = self.bytes
+                stats['max_bytes'] = self.max_bytes
+            return stats
+
+    def __len__(self):
+        return len(self._data)
+
+
+_MISSING = object()
+
+
+def content_hash(data) -> str:
+    """Return a stable hash of a json-serializable object, independent of key order."""
+    dump = json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha1(dump.encode('utf-8')).hexdigest()
+
+
+# scalar types a generated schema tells apart
+SCALAR_SHAPES = {str: 's', int: 'i', float: 'f', bool: 'b', type(None): 'n'}
+
+
+def shape_fingerprint(data) -> str:
+    """Return the structure of a json document as a canonical string: its keys, in order,
+    and json types, without the values. The elements of an array count once per distinct
+    shape, in order of first appearance, which is all that merging them into one schema
+    keeps: ``{'a': 1, 'b': [{'c': 'x'}, {'c': 'y'}]}`` gives ``{'a':i,'b':[{'c':s}]}``.
+    """
+    if isinstance(data, dict):
+        # scalars are looked up inline, a call per value would double the cost
+        return '{' + ','.join([f'{key!r}:{SCALAR_SHAPES.get(type(child)) or shape_fingerprint(child)}'
+                               for key, child in data.items()]) + '}'
+    if isinstance(data, list):
+        shapes = dict.fromkeys([SCALAR_SHAPES.get(type(item)) or shape_fingerprint(item) for item in data])
+        return '[' + ','.join(shapes) + ']'
+    return SCALAR_SHAPES.get(type(data)) or type(data).__name__
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into a single execution.
+
+    The first caller for a key runs the function, callers arriving while it is
+    in flight wait and receive its result or re-raise its exception.
+    """
+    def __init__(self):
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class CachedResponse:
+    """Parsed json body of an upstream response together with its validators."""
+    __slots__ = ('url', 'data', 'digest', 'etag', 'last_modified', 'ttl', 'expires')
+
+    def __init__(self, url, data, digest, etag=None, last_modified=None, ttl=0):
+        self.url = url
+        self.data = data
+        self.digest = digest
+        self.etag = etag
+        self.last_modified = last_modified
+        self.ttl = ttl
+        self.expires = time.monotonic() + ttl
+
+    @property
+    def is_fresh(self):
+        return self.expires > time.monotonic()
+
+
+class ResponseCache:
+    """HTTP-aware cache for json documents fetched from upstream.
+
+    Honours ``Cache-Control`` (``max-age``, ``no-cache``, ``no-store``) and
+    ``Expires``, keeps ``ETag``/``Last-Modified`` and revalidates stale entries
+    with conditional GETs. A ``304 Not Modified`` reuses the parsed body.
+    Misses fall through to an optional shared ``store`` before going upstream.
+    Definitive failures, a ``NEGATIVE_STATUSES`` response or a body that is not
+    valid json, are remembered for ``negative_ttl`` seconds and re-raised
+    without another upstream request. Pinned urls are always served from memory,
+    even when stale, and are renewed out of band with ``refresh``.
+
+        Args:
+            request (callable): ``request(method, url, **kwargs)`` returning a
+                ``requests.Response``, e.g. ``make_request``.
+            maxsize (int): Maximum number of cached documents.
+            default_ttl (float): Freshness lifetime when upstream sends none.
+            store (PersistentCache): Cross-worker cache of response bodies.
+            negative_ttl (float): Seconds a definitive failure is remembered.
+    """
+    NEGATIVE_STATUSES = (404, 410)
+
+    def __init__(self, request, maxsize=256, default_ttl=60, store=None, negative_ttl=30):
+        self.request = request
+        self.default_ttl = default_ttl
+        self.store = store
+        self.revalidations = 0
+        self._entries = LRUCache(maxsize=maxsize)
+        self._failures = LRUCache(maxsize=maxsize, ttl=negative_ttl)
+        self._inflight = SingleFlight()
+        self._pinned = {}
+
+    def fetch(self, url: str) -> CachedResponse:
+        entry = self.lookup(url)
+        if entry is not None:
+            return entry
+
+        # only one request per url goes upstream, concurrent callers share it
+        try:
+            return self._inflight.do(url, self._fetch, url)
+        except Exception as e:
+            self.record_failure(url, e)
+            raise
+
+    def lookup(self, url: str) -> CachedResponse:
+        """Return the entry for url if it can be used without I/O, else ``None``.
+        A remembered failure for url is re-raised."""
+        entry = self._pinned.get(url)
+        if entry is not None:
+            return entry
+
+        entry = self._entries.get(url)
+        if entry is not None and entry.is_fresh:
+            return entry
+
+        error = self._failures.get(url)
+        if error is not None:
+            raise error.with_traceback(None)
+        return None
+
+    def record_failure(self, url: str, error: Exception):
+        if self._is_negative(error):
+            self._failures.set(url, error)
+
+    def pin(self, url: str) -> CachedResponse:
+        """Fetch url and keep it in memory regardless of size and freshness."""
+        entry = self._pinned.get(url) or self.fetch(url)
+        self._pinned[url] = entry
+        return entry
+
+    def preload(self, url: str, data) -> CachedResponse:
+        """Pin a locally produced document under url, it never expires."""
+        entry = CachedResponse(url=url, data=data, digest=content_hash(data), ttl=float('inf'))
+        self._pinned[url] = entry
+        return entry
+
+    def replace_preloaded(self, documents: dict, previous=()):
+        """Pin locally produced documents by url, see ``preload``, and unpin the urls of
+        ``previous`` that documents does not have, all in one step: readers see either
+        the old or the new set of documents, never a mix of both."""
+        pinned = {url: entry for url, entry in self._pinned.items() if url not in previous}
+        for url, data in documents.items():
+            pinned[url] = CachedResponse(url=url, data=data, digest=content_hash(data), ttl=float('inf'))
+        self._pinned = pinned
+
+    def refresh(self, url: str, margin=0) -> CachedResponse:
+        """Revalidate a pinned url if it expires within ``margin`` seconds."""
+        entry = self._pinned.get(url)
+        if entry is None:
+            return self.pin(url)
+        if entry.expires - margin > time.monotonic():
+            return entry
+        # still fresh within the margin, revalidated anyway so it never expires while pinned
+        entry = self._pinned[url] = self._inflight.do(url, self._fetch, url, entry, True)
+        return entry
+
+    def pinned(self):
+        return list(self._pinned)
+
+    def _is_negative(self, error: Exception) -> bool:
+        if isinstance(error, ValueError):
+            return True
+        # make_request chains the original HTTP status error
+        response = getattr(error.__cause__, 'response', None)
+        return getattr(response, 'status_code', None) in self.NEGATIVE_STATUSES
+
+    def _fetch(self, url: str, entry: CachedResponse = None, force=False) -> CachedResponse:
+        entry = self.stale_entry(url, entry)
+        if entry is not None and entry.is_fresh and not force:
+            return entry
+        response = self.request('GET', url, headers=self.conditional_headers(entry))
+        return self.update(url, entry, response)
+
+    def stale_entry(self, url: str, entry: CachedResponse = None) -> CachedResponse:
+        """Return the entry a fetch of url should revalidate, falling back to the
+        shared store when memory has none. A fresh stored entry is promoted to memory."""
+        if entry is None:
+            entry = self._entries.peek(url)
+        if entry is None and self.store is not None:
+            entry = self._load(url)
+            if entry is not None and entry.is_fresh:
+                self._entries.set(url, entry)
+        return entry
+
+    @staticmethod
+    def conditional_headers(entry: CachedResponse) -> dict:
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def update(self, url: str, entry: CachedResponse, response) -> CachedResponse:
+        """Store an upstream response for url, reusing ``entry`` on a 304.
+
+            Args:
+                url (str): Requested url.
+                entry (CachedResponse): Stale entry the request revalidated.
+                response (requests.Response or httpx.Response): Upstream response.
+            Returns:
+                entry (CachedResponse): Entry now cached for url.
+        """
+        if entry is not None and response.status_code == 304:
+            # a 304 may omit caching headers, the stored ones then still apply
+            self.revalidations += 1
+            if 'Cache-Control' in response.headers or 'Expires' in response.headers:
+                entry.ttl = self._freshness_lifetime(response.headers) or 0
+            entry.expires = time.monotonic() + entry.ttl
+            entry.etag = response.headers.get('ETag', entry.etag)
+            entry.last_modified = response.headers.get('Last-Modified', entry.last_modified)
+            self._entries.set(url, entry)
+            if self.store is not None:
+                self.store.touch(url, entry.ttl)
+            return entry
+
+        ttl = self._freshness_lifetime(response.headers)
+        entry = CachedResponse(
+            url=url,
+            data=response.json(),
+            digest=hashlib.sha1(response.content).hexdigest(),
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+            ttl=ttl or 0
+        )
+        if ttl is not None:
+            self._entries.set(url, entry)
+        else:
+            self._entries.pop(url)
+
+        if self.store is not None:
+            if ttl is not None:
+                self.store.set(url, response.content, entry.etag, entry.last_modified, ttl)
+            else:
+                self.store.delete(url)
+        return entry
+
+    def _load(self, url: str) -> CachedResponse:
+        stored = self.store.get(url)
+        if stored is None:
+            return None
+        try:
+            data = json.loads(stored.body)
+        except ValueError:
+            self.store.delete(url)
+            return None
+        entry = CachedResponse(
+            url=url,
+            data=data,
+            digest=hashlib.sha1(stored.body).hexdigest(),
+            etag=stored.etag,
+            last_modified=stored.last_modified,
+            ttl=stored.ttl
+        )
+        entry.expires = time.monotonic() + stored.expires - time.time()
+        return entry
+
+    def digest(self, url: str, data) -> str:
+        """Return the body hash of the cached document if ``data`` is it, else hash ``data``."""
+        entry = self._pinned.get(url) or self._entries.peek(url)
+        if entry is not None and entry.data is data:
+            return entry.digest
+        return content_hash(data)
+
+    def invalidate(self, url: str):
+        self._entries.pop(url)
+        self._failures.pop(url)
+        if self.store is not None:
+            self.store.delete(url)
+
+    def clear(self):
+        self._entries.clear()
+        self._failures.clear()
+        self.revalidations = 0
+
+    def stats(self):
+        stats = self._entries.stats()
+        stats['revalidations'] = self.revalidations
+        stats['coalesced'] = self._inflight.coalesced
+        stats['negative'] = len(self._failures)
+        stats['pinned'] = len(self._pinned)
+        return stats
+
+    def _freshness_lifetime(self, headers):
+        """Return seconds the response may be reused, ``0`` to always revalidate
+        or ``None`` if it must not be stored at all."""
+        directives = {}
+        for directive in headers.get('Cache-Control', '').split(','):
+            name, _, value = directive.strip().partition('=')
+            if name:
+                directives[name.lower()] = value.strip('"')
+
+        if 'no-store' in directives:
+            return None
+        if 'no-cache' in directives:
+            return 0
+        if 'max-age' in directives:
+            try:
+                return max(int(directives['max-age']), 0)
+            except ValueError:
+                return 0
+        if headers.get('Expires'):
+            try:
+                expires = parsedate_to_datetime(headers['Expires']).timestamp()
+            except (TypeError, ValueError):
+                return 0
+            return max(expires - time.time(), 0)
+        return self.default_ttl
+
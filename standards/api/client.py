@@ -0,0 +1,275 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
+
+from standards.api.cache import LRUCache
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised without touching the network while a host's circuit is open."""
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker for a single upstream host.
+
+    After ``threshold`` consecutive failures the circuit opens and calls fail
+    fast for ``recovery_timeout`` seconds. Then one probe call is let through
+    (half-open): its success closes the circuit, its failure re-opens it.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, threshold=5, recovery_timeout=30):
+        self.threshold = threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """End a call whose outcome says nothing about the host, e.g. one that never got a
+        connection. A half-open probe is given up, so the next call may probe again."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+
+
+class AdmissionRejected(Exception):
+    """Raised when the admission limiter has no free slot and its queue is full."""
+
+
+class AdmissionLimiter:
+    """Bounds concurrent upstream fetches and the number of callers waiting for a slot.
+
+        Args:
+            max_concurrency (int): Fetches allowed in flight at once.
+            max_queue (int): Callers allowed to wait for a slot, more are rejected.
+            queue_timeout (float): Seconds a caller waits before being rejected.
+    """
+    def __init__(self, max_concurrency=8, max_queue=16, queue_timeout=2.0):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.queue_wait = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            if self.active < self.max_concurrency and not self.waiting:
+                self.active += 1
+                self.admitted += 1
+                return
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                raise AdmissionRejected('Upstream queue is full')
+
+            self.waiting += 1
+            started = time.monotonic()
+            try:
+                admitted = self._condition.wait_for(
+                    lambda: self.active < self.max_concurrency, timeout=self.queue_timeout)
+            finally:
+                self.waiting -= 1
+                self.queue_wait += time.monotonic() - started
+            if not admitted:
+                self.rejected += 1
+                raise AdmissionRejected(f'No upstream slot within {self.queue_timeout}s')
+            self.active += 1
+            self.admitted += 1
+
+    def release(self):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+    def stats(self):
+        with self._condition:
+            return {
+                'active': self.active,
+                'waiting': self.waiting,
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'queue_wait_seconds': round(self.queue_wait, 6)
+            }
+
+
+class UpstreamClient:
+    """Pooled keep-alive HTTP client used for every request to the standards host.
+
+    The underlying ``requests.Session`` is created lazily and re-created after a
+    fork, so each gunicorn worker owns its own connection pool.
+
+        Args:
+            pool_size (int): Connections kept alive per host.
+            connect_timeout (float): Seconds to wait for a connection.
+            read_timeout (float): Seconds to wait between bytes of the response.
+            retries (int): Extra attempts on connection errors, timeouts and
+                ``RETRY_STATUSES``.
+            backoff (float): Base delay of the exponential backoff, in seconds.
+            backoff_max (float): Upper bound of a single backoff delay.
+            hedge_after (float): If set, a second identical GET is sent when the
+                first has not completed after this many seconds, and whichever
+                finishes first wins.
+            breaker_threshold (int): Consecutive failures that open a host's
+                circuit, ``0`` disables the breaker.
+            breaker_recovery (float): Seconds an open circuit fails fast before
+                a probe request is allowed.
+            breaker_hosts (int): Hosts whose breaker is kept. The hosts come from
+                the ``@context`` urls of requests, so the least recently used are dropped.
+    """
+    RETRY_STATUSES = (502, 503, 504)
+    IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, pool_size=10, connect_timeout=3.05, read_timeout=10, retries=2,
+                 backoff=0.1, backoff_max=1.0, hedge_after=None, breaker_threshold=5,
+                 breaker_recovery=30, breaker_hosts=256):
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.hedge_after = hedge_after
+        self.breaker_threshold = breaker_threshold
+        self.breaker_recovery = breaker_recovery
+        self._breakers = LRUCache(maxsize=breaker_hosts)
+        self._pid = None
+        self._session = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+                    self._executor = None
+                    self._pid = os.getpid()
+        return self._session
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        self.session  # the executor is per process as well
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.pool_size, thread_name_prefix='upstream-hedge')
+        return self._executor
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        return self._breakers.get_or_set(
+            urlsplit(url).netloc, lambda: CircuitBreaker(self.breaker_threshold, self.breaker_recovery))
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        if not self.breaker_threshold:
+            return self._request(method, url, **kwargs)
+
+        breaker = self.breaker(url)
+        if not breaker.allow():
+            raise CircuitOpenError(f'Circuit for {urlsplit(url).netloc} is open')
+        try:
+            response = self._request(method, url, **kwargs)
+        except Exception:
+            breaker.record_failure()
+            raise
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        idempotent = method.upper() in self.IDEMPOTENT_METHODS
+        attempts = self.retries + 1 if idempotent else 1
+
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            try:
+                if idempotent and self.hedge_after is not None:
+                    response = self._hedged_send(method, url, **kwargs)
+                else:
+                    response = self.session.request(method=method, url=url, **kwargs)
+            except (ConnectionError, Timeout):
+                if last_attempt:
+                    raise
+            else:
+                if last_attempt or response.status_code not in self.RETRY_STATUSES:
+                    return response
+                response.close()
+            time.sleep(self.backoff_delay(attempt))
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter."""
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+
+    def _hedged_send(self, method: str, url: str, **kwargs) -> requests.Response:
+        send = self.session.request
+        pending = {self.executor.submit(send, method=method, url=url, **kwargs)}
+        done, pending = wait(pending, timeout=self.hedge_after)
+        if not done:
+            pending.add(self.executor.submit(send, method=method, url=url, **kwargs))
+
+        error = None
+        while pending or done:
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        loser.add_done_callback(_close_response)
+                    return future.result()
+                error = future.exception()
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        raise error
+
+
+def _close_response(future):
+    if future.exception() is None:
+        future.result().close()
@@ -0,0 +1,131 @@
+import json
+import re
+
+from flask.json import JSONDecoder as FlaskJSONDecoder, JSONEncoder as FlaskJSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKENDS = ('orjson', 'json')
+
+_backend = orjson
+
+# orjson reads integers outside the 64 bit range as floats; a run of 19 digits may be one
+_LONG_DIGITS = re.compile(r'[0-9]{19}')
+_LONG_DIGITS_BYTES = re.compile(rb'[0-9]{19}')
+
+
+def select(name: str) -> str:
+    """Use the named backend when it is installed, the standard library ``json`` otherwise.
+
+        Args:
+            name (str): ``orjson`` or ``json``.
+        Returns:
+            backend (str): Name of the backend in use.
+    """
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f'Unknown JSON codec {name!r}, expected one of {BACKENDS}')
+    _backend = orjson if name == 'orjson' else None
+    return backend()
+
+
+def backend() -> str:
+    return 'orjson' if _backend is not None else 'json'
+
+
+def loads(data):
+    """Parse a json document from str or bytes. Documents that may hold integers
+    beyond 64 bits, which orjson would read as floats, are parsed by ``json``."""
+    if _backend is not None and not _has_long_digits(data):
+        try:
+            return _backend.loads(data)
+        except _backend.JSONDecodeError:
+            # NaN and the error message are left to json
+            pass
+    return json.loads(data)
+
+
+def _has_long_digits(data) -> bool:
+    if isinstance(data, str):
+        return _LONG_DIGITS.search(data) is not None
+    return _LONG_DIGITS_BYTES.search(data) is not None
+
+
+def dumps(obj, indent=None, separators=None, ensure_ascii=True, sort_keys=False, default=None) -> str:
+    """Serialize obj like ``json.dumps`` with the same arguments: same layout, escaping
+    and key order. Only floats may be written differently, orjson gives ``1e16`` for
+    ``1e+16`` and ``0.00001`` for ``1e-05``, and NaN as null.
+
+    The fast backend is used for the formats it can produce: compact output, or
+    an integer indent with ``': '`` after keys. Anything else, and any object the
+    backend rejects, goes through ``json.dumps``.
+    """
+    if indent is None:
+        separators = separators or (', ', ': ')
+    else:
+        separators = separators or (',', ': ')
+    text = _fast_dumps(obj, indent, separators, ensure_ascii, sort_keys, default)
+    if text is None:
+        text = json.dumps(obj, indent=indent, separators=separators, ensure_ascii=ensure_ascii,
+                          sort_keys=sort_keys, default=default)
+    return text
+
+
+def _fast_dumps(obj, indent, separators, ensure_ascii: bool, sort_keys: bool, default):
+    if _backend is None:
+        return None
+    if indent is None:
+        if tuple(separators) != (',', ':'):
+            return None
+        option = 0
+    elif isinstance(indent, int) and not isinstance(indent, bool) and indent > 0 and tuple(separators) == (',', ': '):
+        option = _backend.OPT_INDENT_2
+    else:
+        return None
+
+    # dates and dataclasses are left to default, as json.dumps does
+    option |= _backend.OPT_PASSTHROUGH_DATETIME | _backend.OPT_PASSTHROUGH_DATACLASS
+    # json.dumps sorts the original keys, which fails for keys of mixed types
+    option |= _backend.OPT_SORT_KEYS if sort_keys else _backend.OPT_NON_STR_KEYS
+    try:
+        text = _backend.dumps(obj, default=default, option=option).decode('utf-8')
+    except TypeError:
+        # unsupported types, integers beyond 64 bits or circular references
+        return None
+
+    # json.dumps escapes non-ASCII characters and DEL, which is rare enough to leave to it
+    if ensure_ascii and (not text.isascii() or '\x7f' in text):
+        return None
+    if indent is not None and indent != 2:
+        text = _reindent(text, indent)
+    return text
+
+
+def _reindent(text: str, indent: int) -> str:
+    """Turn the two space indent of orjson into indent spaces. Tabs only occur
+    escaped inside strings, so they can mark the indentation converted so far."""
+    text = text.replace('\n  ', '\n\t')
+    while '\t  ' in text:
+        text = text.replace('\t  ', '\t\t')
+    return text.replace('\t', ' ' * indent)
+
+
+class JSONEncoder(FlaskJSONEncoder):
+    """Flask encoder serializing through ``dumps``, so ``jsonify`` uses the fast backend."""
+    def encode(self, o) -> str:
+        if self.skipkeys or not self.allow_nan:
+            return super().encode(o)
+        separators = (self.item_separator, self.key_separator)
+        return dumps(o, indent=self.indent, separators=separators, ensure_ascii=self.ensure_ascii,
+                     sort_keys=self.sort_keys, default=self.default)
+
+
+class JSONDecoder(FlaskJSONDecoder):
+    """Flask decoder parsing through ``loads``, used by ``request.get_json``."""
+    def decode(self, s, *args, **kwargs):
+        if self.object_hook or self.object_pairs_hook:
+            return super().decode(s, *args, **kwargs)
+        return loads(s)
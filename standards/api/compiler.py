@@ -0,0 +1,192 @@
+from numbers import Number
+
+from jsonschema import Draft7Validator
+from jsonschema._utils import equal, unbool
+from jsonschema.exceptions import ValidationError
+
+SUPPORTED_KEYWORDS = ('type', 'const', 'enum', 'minLength', 'properties', 'required')
+
+# Python refuses source indented 100 levels deep, two levels are used per nested object
+MAX_INDENT = 96
+
+# expressions mirroring the Draft 7 type checker, formatted with the instance variable
+TYPE_CHECKS = {
+    'array': 'isinstance({0}, list)',
+    'boolean': 'isinstance({0}, bool)',
+    'integer': '(isinstance({0}, int) and not isinstance({0}, bool)'
+               ' or isinstance({0}, float) and {0}.is_integer())',
+    'null': '{0} is None',
+    'number': '(isinstance({0}, Number) and not isinstance({0}, bool))',
+    'object': 'isinstance({0}, dict)',
+    'string': 'isinstance({0}, str)'
+}
+
+
+class UnsupportedSchema(Exception):
+    """Raised when a schema uses a keyword or form the compiler does not handle."""
+
+
+class CompiledValidator:
+    """Drop-in replacement for ``Draft7Validator`` generated for a single schema.
+
+    Yields the same ``ValidationError`` objects, in the same order, as
+    ``Draft7Validator(schema).iter_errors`` would.
+
+        Args:
+            schema (dict): Schema the validator was compiled from.
+            iter_errors (callable): Generated ``iter_errors(instance)`` function.
+            source (str): Python source of the generated function.
+    """
+    def __init__(self, schema: dict, iter_errors, source: str):
+        self.schema = schema
+        self.source = source
+        self._iter_errors = iter_errors
+
+    def iter_errors(self, instance):
+        return self._iter_errors(instance)
+
+    def is_valid(self, instance) -> bool:
+        return next(self._iter_errors(instance), None) is None
+
+
+def compile_schema(schema: dict) -> CompiledValidator:
+    """Generate a Python validation function for schema.
+
+        Args:
+            schema (dict): Draft 7 schema using only ``SUPPORTED_KEYWORDS``.
+        Returns:
+            validator (CompiledValidator): Validator for schema.
+        Raises:
+            UnsupportedSchema: schema needs the generic validator.
+    """
+    compiler = _Compiler()
+    compiler.emit(1, 'yield from ()')
+    try:
+        compiler.compile(schema, 'i0', 1, (), ())
+        source = 'def iter_errors(i0):\n' + '\n'.join(compiler.lines) + '\n'
+
+        namespace = dict(compiler.constants, Number=Number, equal=equal, enum_fails=_enum_fails, error=_error)
+        exec(compile(source, '<compiled schema>', 'exec'), namespace)
+    except (SyntaxError, RecursionError, MemoryError) as e:
+        # limits of the Python compiler, e.g. a schema nested too deeply
+        raise UnsupportedSchema(f'Generated code does not compile: {e}') from e
+    return CompiledValidator(schema, namespace['iter_errors'], source)
+
+
+def build_validator(schema: dict, compiled=True):
+    """Return a compiled validator for schema, or ``Draft7Validator`` when compiling
+    is disabled or the schema is outside the supported subset."""
+    if compiled:
+        try:
+            return compile_schema(schema)
+        except UnsupportedSchema:
+            pass
+    return Draft7Validator(schema)
+
+
+def _enum_fails(instance, enums) -> bool:
+    if instance == 0 or instance == 1:
+        unbooled = unbool(instance)
+        return all(unbooled != unbool(each) for each in enums)
+    return instance not in enums
+
+
+def _error(site, instance, message: str) -> ValidationError:
+    validator, value, schema, path, schema_path = site
+    return ValidationError(
+        message,
+        validator=validator,
+        validator_value=value,
+        instance=instance,
+        schema=schema,
+        path=path,
+        schema_path=schema_path
+    )
+
+
+class _Compiler:
+    """Accumulates the source lines and constants of one generated function."""
+    def __init__(self):
+        self.lines = []
+        self.constants = {}
+        self.variables = 0
+
+    def emit(self, depth: int, line: str):
+        if depth > MAX_INDENT:
+            raise UnsupportedSchema(f'Schemas nested deeper than {MAX_INDENT // 2} objects are not compiled')
+        self.lines.append('    ' * depth + line)
+
+    def constant(self, value) -> str:
+        name = f'c{len(self.constants)}'
+        self.constants[name] = value
+        return name
+
+    def variable(self) -> str:
+        self.variables += 1
+        return f'i{self.variables}'
+
+    def compile(self, schema: dict, var: str, depth: int, path: tuple, schema_path: tuple):
+        if not isinstance(schema, dict) or '$ref' in schema:
+            raise UnsupportedSchema('Only object schemas without $ref are compiled')
+
+        # keywords are checked in schema order, as Draft7Validator does
+        for keyword, value in schema.items():
+            if keyword not in Draft7Validator.VALIDATORS:
+                continue
+            if keyword not in SUPPORTED_KEYWORDS:
+                raise UnsupportedSchema(f'Keyword {keyword} is not compiled')
+            site = self.constant((keyword, value, schema, path, schema_path + (keyword,)))
+            getattr(self, f'compile_{keyword}')(value, var, depth, site, path, schema_path)
+
+    def compile_type(self, value, var, depth, site, path, schema_path):
+        types = [value] if isinstance(value, str) else value
+        if not isinstance(types, list) or not all(t in TYPE_CHECKS for t in types):
+            raise UnsupportedSchema(f'Type {value!r} is not compiled')
+        check = ' or '.join(TYPE_CHECKS[t].format(var) for t in types) or 'False'
+        message = self.constant(' is not of type ' + ', '.join(repr(t) for t in types))
+        self.emit(depth, f'if not ({check}):')
+        self.emit(depth + 1, f'yield error({site}, {var}, repr({var}) + {message})')
+
+    def compile_const(self, value, var, depth, site, path, schema_path):
+        const = self.constant(value)
+        message = self.constant('%r was expected' % (value,))
+        self.emit(depth, f'if not equal({var}, {const}):')
+        self.emit(depth + 1, f'yield error({site}, {var}, {message})')
+
+    def compile_enum(self, value, var, depth, site, path, schema_path):
+        if not isinstance(value, list):
+            raise UnsupportedSchema('Only list enums are compiled')
+        enums = self.constant(value)
+        message = self.constant(' is not one of %r' % (value,))
+        self.emit(depth, f'if enum_fails({var}, {enums}):')
+        self.emit(depth + 1, f'yield error({site}, {var}, repr({var}) + {message})')
+
+    def compile_minLength(self, value, var, depth, site, path, schema_path):
+        limit = self.constant(value)
+        self.emit(depth, f'if isinstance({var}, str) and len({var}) < {limit}:')
+        self.emit(depth + 1, f'yield error({site}, {var}, repr({var}) + " is too short")')
+
+    def compile_required(self, value, var, depth, site, path, schema_path):
+        if not isinstance(value, list) or not all(isinstance(p, str) for p in value):
+            raise UnsupportedSchema('Only lists of property names are compiled as required')
+        if not value:
+            return
+        self.emit(depth, f'if isinstance({var}, dict):')
+        for name in value:
+            key = self.constant(name)
+            message = self.constant('%r is a required property' % name)
+            self.emit(depth + 1, f'if {key} not in {var}:')
+            self.emit(depth + 2, f'yield error({site}, {var}, {message})')
+
+    def compile_properties(self, value, var, depth, site, path, schema_path):
+        if not isinstance(value, dict):
+            raise UnsupportedSchema('Only mappings are compiled as properties')
+        if not value:
+            return
+        self.emit(depth, f'if isinstance({var}, dict):')
+        for name, subschema in value.items():
+            key = self.constant(name)
+            child = self.variable()
+            self.emit(depth + 1, f'if {key} in {var}:')
+            self.emit(depth + 2, f'{child} = {var}[{key}]')
+            self.compile(subschema, child, depth + 2, path + (name,), schema_path + ('properties', name))
@@ -0,0 +1,124 @@
+import gzip
+import io
+import zlib
+
+from standards.errors import BadRequestSyntaxException, PayloadTooLargeException, UnsupportedMediaTypeException
+
+ENCODINGS = ('gzip', 'deflate')
+
+
+class DecompressedStream(io.RawIOBase):
+    """Readable stream of the decompressed content of a gzip or deflate stream.
+
+    Data is inflated chunk by chunk into the caller's buffer, so the whole body
+    is never held in memory, and reading stops with ``PayloadTooLargeException``
+    once more than ``max_bytes`` have been produced.
+
+        Args:
+            stream: Binary stream of the compressed body.
+            encoding (str): ``gzip`` or ``deflate``.
+            max_bytes (int): Limit for the decompressed size.
+            chunk_size (int): Compressed bytes read at once.
+    """
+    def __init__(self, stream, encoding: str, max_bytes: int, chunk_size=64 * 1024):
+        self.stream = stream
+        self.encoding = encoding
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.total = 0
+        self._decompressor = None
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer) -> int:
+        try:
+            data = self._inflate(len(buffer))
+        except zlib.error as e:
+            raise BadRequestSyntaxException(f'The request body is not valid {self.encoding} data: {e}')
+        self.total += len(data)
+        if self.total > self.max_bytes:
+            raise PayloadTooLargeException(f'The decompressed request body exceeds {self.max_bytes} bytes.')
+        buffer[:len(data)] = data
+        return len(data)
+
+    def _inflate(self, size: int) -> bytes:
+        while True:
+            decompressor = self._decompressor
+            if decompressor is not None and decompressor.unconsumed_tail:
+                data = decompressor.decompress(decompressor.unconsumed_tail, size)
+            elif decompressor is not None and decompressor.eof:
+                return b''
+            else:
+                chunk = self.stream.read(self.chunk_size)
+                if not chunk:
+                    if decompressor is None or not decompressor.eof:
+                        raise zlib.error('unexpected end of data')
+                    return b''
+                if decompressor is None:
+                    decompressor = self._decompressor = zlib.decompressobj(self._wbits(chunk))
+                data = decompressor.decompress(chunk, size)
+            if data:
+                return data
+
+    def _wbits(self, head: bytes) -> int:
+        if self.encoding == 'gzip':
+            return 16 + zlib.MAX_WBITS
+        # "deflate" is meant to be zlib wrapped, some clients send the raw stream
+        if len(head) >= 2 and head[0] & 0x0f == 8 and (head[0] << 8 | head[1]) % 31 == 0:
+            return zlib.MAX_WBITS
+        return -zlib.MAX_WBITS
+
+
+def decompressing_stream(stream, content_encoding: str, max_bytes: int):
+    """Wrap a request body stream according to its ``Content-Encoding``.
+
+        Args:
+            stream: Binary request body.
+            content_encoding (str): Value of the ``Content-Encoding`` header.
+            max_bytes (int): Limit for the decompressed size.
+        Returns:
+            stream: Buffered stream of the decoded body, stream itself if not encoded.
+        Raises:
+            UnsupportedMediaTypeException: the encoding is not gzip or deflate.
+    """
+    codings = [coding.strip().lower() for coding in content_encoding.split(',') if coding.strip()]
+    codings = [coding for coding in codings if coding != 'identity']
+    for coding in codings:
+        if coding not in ENCODINGS:
+            raise UnsupportedMediaTypeException(f'Content-Encoding {coding} is not supported.')
+    # codings are listed in the order they were applied
+    for coding in reversed(codings):
+        stream = io.BufferedReader(DecompressedStream(stream, coding, max_bytes))
+    return stream
+
+
+def negotiate_encoding(accept) -> str:
+    """Return the encoding with the highest quality in a parsed ``Accept-Encoding``
+    header, gzip on a tie, or ``None`` if the client accepts neither."""
+    encoding = max(ENCODINGS, key=lambda coding: accept[coding])
+    return encoding if accept[encoding] > 0 else None
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    return zlib.compress(body, level)
+
+
+def compress_response(response, accept, min_bytes: int, level: int):
+    """Compress a complete Flask response body of at least ``min_bytes`` with the
+    encoding the client prefers. Streamed responses are left as they are."""
+    if response.is_streamed or response.direct_passthrough or 'Content-Encoding' in response.headers:
+        return response
+    response.vary.add('Accept-Encoding')
+
+    encoding = negotiate_encoding(accept)
+    if encoding is None or response.status_code in (204, 304):
+        return response
+    body = response.get_data()
+    if len(body) < min_bytes:
+        return response
+    response.set_data(compress(body, encoding, level))
+    response.headers['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,164 @@
+import hashlib
+
+from jsonschema import Draft7Validator
+
+from standards.api.cache import LRUCache
+
+# keywords whose subschemas depend on more than the position in the document
+COMPOSITE_KEYWORDS = (
+    '$ref', 'additionalItems', 'additionalProperties', 'allOf', 'anyOf', 'contains',
+    'dependencies', 'if', 'not', 'oneOf', 'patternProperties', 'propertyNames'
+)
+
+
+def fingerprint_tree(data):
+    """Return the fingerprint tree of a json document and its number of nodes.
+
+    A scalar is represented by its fingerprint, an object or array by a
+    ``(fingerprint, children)`` pair with children by key or in order. The
+    fingerprint of an object does not depend on the order of its keys.
+    """
+    counter = [0]
+    return _fingerprint(data, counter), counter[0]
+
+
+def _fingerprint(value, counter):
+    counter[0] += 1
+    if isinstance(value, dict):
+        children = {key: _fingerprint(child, counter) for key, child in value.items()}
+        parts = sorted(f'{key!r}:{_digest(child)}' for key, child in children.items())
+        return _hash('{' + ','.join(parts)), children
+    if isinstance(value, list):
+        children = tuple(_fingerprint(child, counter) for child in value)
+        return _hash('[' + ','.join(_digest(child) for child in children)), children
+    # a short repr is its own fingerprint, repr keeps 1, 1.0 and True apart
+    text = repr(value)
+    return text if len(text) <= 32 else _hash(text)
+
+
+def _hash(text: str) -> str:
+    return '#' + hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _digest(node) -> str:
+    return node if isinstance(node, str) else node[0]
+
+
+def _children(node):
+    return None if node is None or isinstance(node, str) else node[1]
+
+
+def delta_supported(schema) -> bool:
+    """Whether the subschema applying to every position of a document follows from
+    ``properties`` and ``items`` alone, which makes unchanged subtrees skippable."""
+    if not isinstance(schema, dict) or any(keyword in schema for keyword in COMPOSITE_KEYWORDS):
+        return False
+    properties = schema.get('properties', {})
+    items = schema.get('items', {})
+    if not isinstance(properties, dict) or not isinstance(items, dict):
+        return False
+    return all(delta_supported(subschema) for subschema in properties.values()) and (
+        'items' not in schema or delta_supported(items))
+
+
+def changed_errors(validator: Draft7Validator, schema: dict, instance, node, previous,
+                   path=(), schema_path=()):
+    """Yield the errors ``validator.iter_errors`` would report for instance, skipping
+    every subtree whose fingerprint equals the one of the previous, valid, version.
+
+        Args:
+            validator (Draft7Validator): Validator of the root schema.
+            schema (dict): Subschema applying to instance.
+            instance: Part of the document at ``path``.
+            node: Fingerprint tree of instance.
+            previous: Fingerprint tree of the same part of the previous version, if any.
+            path (tuple): Position of instance in the document.
+            schema_path (tuple): Position of schema in the root schema.
+    """
+    if previous is not None and _digest(previous) == _digest(node):
+        return
+
+    children, previous_children = _children(node), _children(previous)
+    for keyword, value in schema.items():
+        if keyword == 'properties':
+            if not isinstance(instance, dict):
+                continue
+            for name, subschema in value.items():
+                if name in instance:
+                    previous_child = previous_children.get(name) if isinstance(previous_children, dict) else None
+                    yield from changed_errors(
+                        validator, subschema, instance[name], children[name], previous_child,
+                        path + (name,), schema_path + ('properties', name))
+        elif keyword == 'items':
+            if not isinstance(instance, list):
+                continue
+            for index, item in enumerate(instance):
+                previous_child = None
+                if isinstance(previous_children, tuple) and index < len(previous_children):
+                    previous_child = previous_children[index]
+                yield from changed_errors(
+                    validator, value, item, children[index], previous_child,
+                    path + (index,), schema_path + ('items',))
+        else:
+            check = validator.VALIDATORS.get(keyword)
+            if check is None:
+                continue
+            # same bookkeeping as Draft7Validator.iter_errors and descend
+            for error in check(validator, value, instance, schema) or ():
+                error._set(validator=keyword, validator_value=value, instance=instance, schema=schema)
+                error.schema_path.appendleft(keyword)
+                error.schema_path.extendleft(reversed(schema_path))
+                error.path.extendleft(reversed(path))
+                yield error
+
+
+class DeltaStore:
+    """Fingerprint trees of the last valid version of documents, by ``@id``.
+
+    A document whose ``@id`` was last valid under the same schema is re-validated
+    only where its fingerprint tree differs: an unchanged subtree of a valid version
+    cannot produce errors. Other documents, and schemas with keywords that make
+    the subschema of a position depend on more than the path, are validated fully.
+
+        Args:
+            maxsize (int): Documents remembered.
+            max_bytes (int): Budget for the estimated size of the stored trees.
+    """
+    # rough size of one tree node: digest, tuple or dict slot and key
+    NODE_BYTES = 120
+
+    def __init__(self, maxsize=1024, max_bytes=64 * 1024 * 1024):
+        self.delta_validations = 0
+        self._trees = LRUCache(maxsize=maxsize, max_bytes=max_bytes)
+        self._validators = LRUCache(maxsize=64)
+
+    def iter_errors(self, digest: str, validator, data):
+        """Yield the validation errors of data against the schema with content hash
+        ``digest``, remembering data as the last valid version of its ``@id``."""
+        document_id = data.get('@id') if isinstance(data, dict) else None
+        if not isinstance(document_id, str) or not document_id:
+            yield from validator.iter_errors(data)
+            return
+
+        tree, nodes = fingerprint_tree(data)
+        stored = self._trees.get(document_id)
+        generic = self._validators.get_or_set(
+            digest, lambda: Draft7Validator(validator.schema) if delta_supported(validator.schema) else None)
+        if stored is not None and stored[0] == digest and generic is not None:
+            self.delta_validations += 1
+            errors = changed_errors(generic, validator.schema, data, tree, stored[1])
+        else:
+            errors = validator.iter_errors(data)
+
+        valid = True
+        for error in errors:
+            valid = False
+            yield error
+        # only valid versions are kept, the next one is compared to the last of them
+        if valid:
+            self._trees.set(document_id, (digest, tree), size=nodes * self.NODE_BYTES)
+
+    def stats(self):
+        stats = self._trees.stats()
+        stats['delta_validations'] = self.delta_validations
+        return stats
@@ -1,10 +1,10 @@
 import os
-import json
 from owlready2 import default_world, base, locstr, label, comment
 from .extentions import restriction, domain, subPropertyOf, nest
 from .extentions import range as owl_range
 from .extentions import label as pot_label
 from .extentions import comment as pot_comment
+from standards.api import codec
 
 
 class AbstractRDFEntity:
@@ -32,8 +32,8 @@ class AbstractRDFEntity:
         if is_json:
             entity_file_path = entity_file_path[:-2]
         with open(entity_file_path, 'w', encoding='utf-8') as rf:
-            rf.write(json.dumps(data_to_dump, indent=4,
-                                separators=(',', ': '), ensure_ascii=False))
+            rf.write(codec.dumps(data_to_dump, indent=4,
+                                 separators=(',', ': '), ensure_ascii=False))
 
     @staticmethod
     def build_directories(entity):
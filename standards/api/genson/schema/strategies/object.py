@@ -7,8 +7,45 @@ from owlready2 import get_ontology
 from ...models.extentions import ONTO
 from ...models.rdf_properties import RDFProperty
 
-ONTO_PROPERTIES = {RDFProperty(i, "https://standards.oftrust.net/v2/").entity.name: RDFProperty(
-    i, "https://standards.oftrust.net/v2/") for i in ONTO.properties()}
+ONTO_PROPERTIES = {}
+ONTO_GENERATION = 0
+
+
+def load_onto_properties():
+    """(Re)build the title and description of every ontology property, which annotate
+    generated schemas, and count the version so that schemas generated from an older
+    one can be told apart.
+
+    The new dict replaces the old one in one assignment, and annotating a schema reads
+    only that dict, never the ontology, so requests are not affected by a reload in progress.
+    """
+    global ONTO_PROPERTIES, ONTO_GENERATION
+    properties = {}
+    for entity in ONTO.properties():
+        onto_property = RDFProperty(entity, "https://standards.oftrust.net/v2/")
+        try:
+            properties[onto_property.entity.name] = property_annotation(onto_property)
+        except Exception:
+            print(onto_property.entity.name)
+    ONTO_PROPERTIES = properties
+    ONTO_GENERATION += 1
+
+
+def property_annotation(onto_property) -> tuple:
+    """Return the en-us title and description of an ontology property, ``""`` where it has none."""
+    # If built labels is not empty, take en-us only. Else make sure that "title" is str.
+    l = onto_property.build_labels(onto_property.entity)
+    l = l.get('en-us') if l else ""
+    c = onto_property.build_comments(onto_property.entity)
+    c = c.get('en-us') if c else ""
+    return l, c
+
+
+def onto_generation() -> int:
+    return ONTO_GENERATION
+
+
+load_onto_properties()
 
 
 class Object(SchemaStrategy):
@@ -102,37 +139,25 @@ class Object(SchemaStrategy):
         schema_properties = {}
         for prop, schema_node in properties.items():
             schema_properties[prop] = schema_node.to_schema()
-
-            l = ""
-            c = ""
-            try:
-                _onto_property = ONTO_PROPERTIES[prop]
-                if _onto_property:
-                    l = _onto_property.build_labels(_onto_property.entity)
-                    # If built labels is not empty, take en-us only. Else make sure that "title" is str.
-                    if l:
-                        l = l.get('en-us')
-                    else:
-                        l = ""
-
-                    c = _onto_property.build_comments(_onto_property.entity)
-                    # If built labels is not empty, take en-us only. Else make sure that "title" is str.
-                    if c:
-                        c = c.get('en-us')
-                    else:
-                        c = ""
-                # Add title to schema
-                # schema_properties[prop]['examples'] = []
-            except:
-                print(prop)
-                if prop == "@context":
-                    l = "JSON-LD context url"
-                    c = "JSON-LD context url with terms required to understand data product content."
-                if prop == "@type":
-                    l = "Identity type"
-                    c = "Type of identity."
-
-            schema_properties[prop]['title'] = l
-            schema_properties[prop]['description'] = c
+            schema_properties[prop]['title'], schema_properties[prop]['description'] = self.annotation(prop)
 
         return schema_properties
+
+    @staticmethod
+    def annotation(prop):
+        """Return the title and description of a property from its ontology labels and comments."""
+        l = ""
+        c = ""
+        try:
+            l, c = ONTO_PROPERTIES[prop]
+            # Add title to schema
+            # schema_properties[prop]['examples'] = []
+        except:
+            print(prop)
+            if prop == "@context":
+                l = "JSON-LD context url"
+                c = "JSON-LD context url with terms required to understand data product content."
+            if prop == "@type":
+                l = "Identity type"
+                c = "Type of identity."
+        return l, c
@@ -1,110 +1,140 @@
-import operator
-from copy import deepcopy
-from functools import reduce
 import json
 
+from .schema.strategies import List, Object, SchemaStrategy
+
 
-SCHEMA_OBJECT_VARIABLES = ('properties', 'items')
-SCHEMA_VARIABLES = ('description', 'title', 'type')
 ORDER_OF_SORTING_KEYS = ('$schema', '$id', 'type', 'const', 'title', 'description', 'required', 'items', 'properties')
+SORTING_KEY_INDEX = {key: index for index, key in enumerate(ORDER_OF_SORTING_KEYS)}
+
 
+def emit_schema(builder, schema_id: str, constants: dict = None) -> dict:
+    """Generate the final schema of builder straight from its node tree.
 
-class NestedDict(dict):
+    Produces in one walk ``builder.to_schema()`` with a ``$id`` holding its path in
+    every subschema and the keys in ``ORDER_OF_SORTING_KEYS`` order.
+
+    :param builder: SchemaBuilder the objects were added to
+    :param schema_id: str, ``$id`` of the root schema
+    :param constants: dict of path tuple: value, ``const`` of the subschemas at these paths
+    :return: dict with the schema
     """
-    Dictionary that can use a list to get a value
-
-    :example:
-    >>> nested_dict = NestedDict({'aggs': {'aggs': {'field_I_want': 'value_I_want'}, 'None': None}})
-    >>> path = ['aggs', 'aggs', 'field_I_want']
-    >>> nested_dict[path]
-    'value_I_want'
-    >>> nested_dict[path] = 'changed'
-    >>> nested_dict[path]
-    'changed'
+    return _root_schema(builder, schema_id, constants or {}, _emit_node)
+
+
+def iter_schema_json(builder, schema_id: str, constants: dict = None, dumps=json.dumps, chunk_size=64 * 1024):
+    """Serialize the schema ``emit_schema`` generates as compact JSON text, in chunks.
+
+    Subschemas are generated from the node tree only when the serializer reaches
+    them and dropped once written, so the whole schema is never held in memory.
+    The text joined is ``dumps(emit_schema(...), separators=(',', ':'))``.
+
+    :param builder: SchemaBuilder the objects were added to
+    :param schema_id: str, ``$id`` of the root schema
+    :param constants: dict of path tuple: value, ``const`` of the subschemas at these paths
+    :param dumps: function serializing keys and values without subschemas
+    :param chunk_size: int, least length of the chunks but the last
+    :return: generator of str
     """
-    def __getitem__(self, item):
-        if isinstance(item, list):
-            return self.get_traverse(item)
-        return super(NestedDict, self).__getitem__(item)
-
-    def __setitem__(self, key, value):
-        if isinstance(key, list):
-            for _key in key[:-1]:
-                if _key not in self:
-                    self[_key] = {}
-                self = self[_key]
-            self[key[-1]] = value
-            return self
-        return super(NestedDict, self).__setitem__(key, value)
-
-    def get_traverse(self, _list):
-        return reduce(operator.getitem, _list, self)
-
-    _paths = []
-    _path = []
-
-    def find(self, key, _dict=None, _main_loop=True):
-        """ Find a list of paths to a key
-
-        :param key: str, the key you want to find
-        :param _dict: used for recursive searching
-        :return: list with paths
-        :example:
-        >>> nested_dict = NestedDict({'aggs': {'aggs': {'field_I_want': 'value_I_want'}, 'None': None}})
-        >>> paths = nested_dict.find('field_I_want')
-        >>> paths
-        [['aggs', 'aggs', 'field_I_want']]
-        >>> nested_dict[paths[0]] = 'changed'
-        >>> nested_dict[paths[0]]
-        'changed'
-        """
-        if _main_loop:
-            self._path, self._paths = [], []
-            _dict = self
-
-        for _key in _dict.keys():
-            self._path.append(_key)
-
-            if _key == key:
-                self._paths.append(deepcopy(self._path))
-
-            if isinstance(_dict[_key], dict):
-                self.find(key, _dict[_key], _main_loop=False)
-
-            self._path.pop()
-
-        if _main_loop:
-            return self._paths
-
-
-def schema_path_id_generator(json_schema: json, nested_dict: NestedDict, id_path=[]):
-    for key, value in json_schema.items():
-        if isinstance(value, dict):
-            id_path.append(key)
-            if key != 'properties':
-                nested_dict[id_path].update({'$id': f'#/{"/".join(id_path)}'})
-            if all(not isinstance(item, dict) for item in value.values()):
-                id_path.pop()
-            schema_path_id_generator(value, nested_dict)
-        if key in SCHEMA_OBJECT_VARIABLES:
-            id_path.pop(-1)
-        if id_path:
-            if key not in SCHEMA_VARIABLES and id_path[-1] not in SCHEMA_OBJECT_VARIABLES:
-                id_path.pop(-1)
-
-
-def schema_sorted_first_level(data: dict) -> dict:
-    result = dict(sorted(data.items(), key=lambda pair: ORDER_OF_SORTING_KEYS.index(pair[0])))
-    return result
-
-
-def sorted_nested_dict(data: dict):
-    result = {}
-    for k, v in data.items():
-        if isinstance(v, dict):
-            if k != 'properties':
-                v = dict(sorted(v.items(), key=lambda pair: ORDER_OF_SORTING_KEYS.index(pair[0])))
-            result[k] = sorted_nested_dict(v)
+    schema = _root_schema(builder, schema_id, constants or {}, _Subschema)
+    chunk = []
+    size = 0
+    # members of the objects being written, innermost last, written without recursion
+    stack = [iter((('', schema),))]
+    while stack:
+        member = next(stack[-1], None)
+        if member is None:
+            stack.pop()
+            text = '}' if stack else ''
         else:
-            result[k] = v
-    return result
+            text, value = member
+            if isinstance(value, _Subschema):
+                value = value.emit()
+            if isinstance(value, dict) and any(isinstance(item, (dict, _Subschema)) for item in value.values()):
+                stack.append(_members(value, dumps))
+            else:
+                text += dumps(value)
+        chunk.append(text)
+        size += len(text)
+        if size >= chunk_size:
+            yield ''.join(chunk)
+            chunk = []
+            size = 0
+    if chunk:
+        yield ''.join(chunk)
+
+
+def _members(value: dict, dumps):
+    separator = '{'
+    for key, item in value.items():
+        yield f'{separator}{dumps(key)}:', item
+        separator = ','
+
+
+class _Subschema:
+    """Subschema of a node, generated by ``emit`` when it is serialized."""
+    __slots__ = ('node', 'path', 'constants', 'prop_of')
+
+    def __init__(self, node, path: tuple, constants: dict, prop_of=None):
+        self.node = node
+        self.path = path
+        self.constants = constants
+        self.prop_of = prop_of
+
+    def emit(self) -> dict:
+        return _emit_node(self.node, self.path, self.constants, self.prop_of, _Subschema)
+
+
+def sorted_schema(schema: dict) -> dict:
+    """Order the keys of a schema, keys outside ``ORDER_OF_SORTING_KEYS`` last."""
+    last = len(ORDER_OF_SORTING_KEYS)
+    return dict(sorted(schema.items(), key=lambda pair: SORTING_KEY_INDEX.get(pair[0], last)))
+
+
+def _root_schema(builder, schema_id: str, constants: dict, emit_child) -> dict:
+    schema = builder._base_schema()
+    schema.update(_node_schema(builder._root_node, (), constants, emit_child))
+    schema['$id'] = schema_id
+    return sorted_schema(schema)
+
+
+def _emit_node(node, path: tuple, constants: dict, prop_of=None, emit_child=None) -> dict:
+    # emit_child makes the subschemas, recursively by default or deferred by _Subschema
+    schema = _node_schema(node, path, constants, emit_child or _emit_node)
+    if prop_of is not None:
+        # annotated after the children, in the order Object.to_schema annotates
+        schema['title'], schema['description'] = prop_of.annotation(path[-1])
+    if path in constants:
+        schema['const'] = constants[path]
+    if path[-1] == 'properties':
+        # a property named "properties" is taken for the keyword, no $id and no sorting
+        return schema
+    schema['$id'] = f'#/{"/".join(path)}'
+    return sorted_schema(schema)
+
+
+def _node_schema(node, path: tuple, constants: dict, emit_child) -> dict:
+    if len(node._active_strategies) != 1:
+        # several types make an anyOf list, lists are left as generated
+        return node.to_schema()
+
+    strategy = node._active_strategies[0]
+    if isinstance(strategy, Object):
+        schema = SchemaStrategy.to_schema(strategy)
+        schema['type'] = 'object'
+        if strategy._properties:
+            schema['properties'] = {
+                prop: emit_child(child, path + ('properties', prop), constants, strategy)
+                for prop, child in strategy._properties.items()
+            }
+        if strategy._pattern_properties:
+            schema['patternProperties'] = strategy._properties_to_schema(strategy._pattern_properties)
+        if strategy._required or strategy._include_empty_required:
+            schema['required'] = []
+        return schema
+    if isinstance(strategy, List):
+        schema = SchemaStrategy.to_schema(strategy)
+        schema['type'] = 'array'
+        if strategy._items:
+            schema['items'] = emit_child(strategy._items, path + ('items',), constants)
+        return schema
+    return strategy.to_schema()
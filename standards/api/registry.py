@@ -0,0 +1,71 @@
+import threading
+
+from standards import app
+from standards.api.genson.models.extentions import ONTO
+from standards.api.genson.models.rdf_classes import ContextRDFClass, SchemaRDFClass
+from standards.api.genson.schema.strategies.object import load_onto_properties
+from standards.api.utils import response_cache, schema_cache
+
+# urls the registry pinned last, replaced as a whole on every load
+_registry_urls = frozenset()
+_reload_lock = threading.Lock()
+
+
+def build_registry(onto, base_url: str) -> dict:
+    """Generate the Context and Schema of every ontology class.
+
+        Args:
+            onto (Ontology): Loaded ontology.
+            base_url (str): Url the artifacts are published under, e.g.
+                ``https://standards.oftrust.net/v2/``.
+        Returns:
+            documents (dict of str: dict): Generated documents by their url.
+    """
+    documents = {}
+    for entity in onto.classes():
+        try:
+            context = ContextRDFClass(entity, onto, base_url)
+            entity_id = context.directories.get('id')
+            context_document = context.create_context_from_rdf_class()
+            schema_document = SchemaRDFClass(entity, onto, base_url).create_schema_from_rdf_class()
+        except Exception as e:
+            app.logger.error(f'Registry could not generate artifacts for {entity}: {e}')
+            continue
+        documents[f'{base_url}Context/{entity_id}/'] = context_document
+        documents[f'{base_url}Schema/{entity_id}'] = schema_document
+    return documents
+
+
+def url_variants(url: str) -> tuple:
+    """Return url with and without the trailing slash, clients use both."""
+    url = url.rstrip('/')
+    return url, f'{url}/'
+
+
+def load_registry():
+    """Pin generated Contexts and Schemas in the response cache when registry mode is on,
+    so that validation of documents under the base url needs no network I/O. Documents
+    of classes the ontology no longer has are unpinned."""
+    global _registry_urls
+    if not app.config['REGISTRY_MODE']:
+        return 0
+    documents = build_registry(ONTO, app.config['REGISTRY_BASE_URL'])
+    pinned = {variant: document for url, document in documents.items() for variant in url_variants(url)}
+    response_cache.replace_preloaded(pinned, previous=_registry_urls)
+    _registry_urls = frozenset(pinned)
+    app.logger.info(f'Registry preloaded {len(documents)} documents')
+    return len(documents)
+
+
+def reload_ontology():
+    """Re-read the ontology and rebuild what is derived from it: the property annotations
+    of generated schemas, the schema cache and, in registry mode, the registry documents.
+
+    Requests keep using the annotations and documents of the previous read until the
+    new ones are built, each is then swapped in at once."""
+    with _reload_lock:
+        ONTO.load(reload=True)
+        load_onto_properties()
+        schema_cache.clear()
+        app.logger.info('Ontology reloaded')
+        return load_registry()
@@ -1,11 +1,46 @@
-from flask import request
+from flask import Response, jsonify, request, stream_with_context
 from werkzeug.exceptions import BadRequest
+from werkzeug.wsgi import get_input_stream
 
 from standards import app
-from standards.api import api_bp
-from standards.api.utils import validate_json, schema_generator
+from standards.api import api_bp, codec
+from standards.api.batch import iter_ndjson_documents, iter_ndjson_lines, validate_batch, validate_stream
+from standards.api.compression import compress_response, decompressing_stream
+from standards.api.stream import iter_array_documents, validate_document_stream
+from standards.api.utils import (
+    build_merged_schema,
+    get_max_errors,
+    get_stats,
+    get_stream_mode,
+    schema_generator,
+    stream_merged_schema,
+    validate_json
+)
 from standards.errors import UnsupportedMediaTypeException, UnprocessableEntityException
 
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonlines')
+
+
+@api_bp.before_request
+def decompress_request():
+    content_encoding = request.headers.get('Content-Encoding')
+    if not content_encoding:
+        return
+    # runs before request.stream is first read, which then picks up the decoded input
+    environ = request.environ
+    environ['wsgi.input'] = decompressing_stream(
+        get_input_stream(environ), content_encoding, app.config['MAX_DECOMPRESSED_BYTES'])
+    # the decoded body has no known length, it ends with the compressed stream
+    environ['wsgi.input_terminated'] = True
+    environ.pop('CONTENT_LENGTH', None)
+    environ.pop('HTTP_CONTENT_ENCODING', None)
+
+
+@api_bp.after_request
+def compress(response):
+    return compress_response(
+        response, request.accept_encodings, app.config['COMPRESS_MIN_BYTES'], app.config['COMPRESS_LEVEL'])
+
 
 @api_bp.route('/validate', methods=['POST'])
 def validate():
@@ -21,6 +56,56 @@ def validate():
     return response
 
 
+@api_bp.route('/validate/batch', methods=['POST'])
+def validate_many():
+    try:
+        request.json
+    except BadRequest:
+        raise UnprocessableEntityException()
+    if not request.json:
+        app.logger.error(f'Entity body format {request.data} is not supported')
+        raise UnsupportedMediaTypeException()
+    if not isinstance(request.json, list):
+        raise UnprocessableEntityException('The request body must be a JSON array of documents.')
+    if len(request.json) > app.config['BATCH_MAX_ITEMS']:
+        raise UnprocessableEntityException(
+            f'A batch can contain at most {app.config["BATCH_MAX_ITEMS"]} documents.')
+
+    response = validate_batch(request.json, max_errors=get_max_errors(request.args))
+    return jsonify(response)
+
+
+@api_bp.route('/validate/ndjson', methods=['POST'])
+def validate_ndjson():
+    if request.mimetype not in NDJSON_MIMETYPES:
+        app.logger.error(f'Entity body format {request.mimetype} is not supported')
+        raise UnsupportedMediaTypeException()
+
+    max_line_bytes = app.config['NDJSON_MAX_LINE_BYTES']
+    max_errors = get_max_errors(request.args)
+    lines = iter_ndjson_lines(request.stream, max_line_bytes)
+
+    def generate():
+        for result in validate_stream(lines, max_line_bytes, max_errors):
+            yield codec.dumps(result, separators=(',', ':'), ensure_ascii=app.config['JSON_AS_ASCII']) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@api_bp.route('/validate/stream', methods=['POST'])
+def validate_streamed():
+    if not request.is_json:
+        app.logger.error(f'Entity body format {request.mimetype} is not supported')
+        raise UnsupportedMediaTypeException()
+
+    response = validate_document_stream(
+        request.stream,
+        max_value_bytes=app.config['STREAM_MAX_VALUE_BYTES'],
+        max_errors=get_max_errors(request.args)
+    )
+    return jsonify(response)
+
+
 @api_bp.route('/schema', methods=['POST'])
 def build_schema():
     try:
@@ -31,5 +116,37 @@ def build_schema():
         app.logger.error(f'Entity body format {request.data} is not supported')
         raise UnsupportedMediaTypeException()
 
+    if get_stream_mode(request.args):
+        return stream_schema_response([request.json])
     response = schema_generator(request)
     return response
+
+
+@api_bp.route('/schema/batch', methods=['POST'])
+def build_schema_from_examples():
+    if request.mimetype in NDJSON_MIMETYPES:
+        examples = iter_ndjson_documents(request.stream, app.config['NDJSON_MAX_LINE_BYTES'])
+    elif request.is_json:
+        examples = iter_array_documents(request.stream, app.config['STREAM_MAX_VALUE_BYTES'])
+    else:
+        app.logger.error(f'Entity body format {request.mimetype} is not supported')
+        raise UnsupportedMediaTypeException()
+
+    try:
+        if get_stream_mode(request.args):
+            return stream_schema_response(examples)
+        response = build_merged_schema(examples)
+    except ValueError:
+        raise UnprocessableEntityException()
+    return jsonify(response)
+
+
+def stream_schema_response(examples) -> Response:
+    # the examples are read here, the schema is generated while the response is sent
+    chunks = stream_merged_schema(examples, app.config['SCHEMA_STREAM_CHUNK_BYTES'])
+    return Response(stream_with_context(chunks), mimetype='application/json')
+
+
+@api_bp.route('/stats', methods=['GET'])
+def stats():
+    return get_stats()
@@ -0,0 +1,133 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class StoredResponse:
+    __slots__ = ('body', 'etag', 'last_modified', 'ttl', 'expires')
+
+    def __init__(self, body, etag, last_modified, ttl, expires):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.ttl = ttl
+        self.expires = expires
+
+
+class PersistentCache:
+    """On-disk store of upstream response bodies shared by all workers on a node.
+
+    Backed by a single SQLite database in WAL mode, so readers never block each
+    other and every write is an atomic transaction. Expiry is kept as wall-clock
+    time, which lets a restarted worker tell fresh entries from stale ones.
+    Once the stored bodies exceed ``max_bytes`` the least recently used are
+    deleted. Storage errors are logged and treated as misses.
+
+        Args:
+            path (str): Location of the database file.
+            max_bytes (int): Upper bound for the total size of stored bodies.
+    """
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS responses ('
+        ' url TEXT PRIMARY KEY,'
+        ' body BLOB NOT NULL,'
+        ' etag TEXT,'
+        ' last_modified TEXT,'
+        ' ttl REAL NOT NULL,'
+        ' expires REAL NOT NULL,'
+        ' accessed REAL NOT NULL,'
+        ' size INTEGER NOT NULL)'
+    )
+
+    def __init__(self, path: str, max_bytes=64 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # sqlite connections must not cross threads or a fork
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(self.SCHEMA)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, url: str) -> StoredResponse:
+        try:
+            row = self.connection.execute(
+                'SELECT body, etag, last_modified, ttl, expires FROM responses WHERE url = ?', (url,)
+            ).fetchone()
+            if row is not None:
+                self.connection.execute(
+                    'UPDATE responses SET accessed = ? WHERE url = ?', (time.time(), url))
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f'Persistent cache read failed for {url}: {e}')
+            return None
+        return StoredResponse(*row) if row is not None else None
+
+    def set(self, url: str, body: bytes, etag=None, last_modified=None, ttl=0):
+        if len(body) > self.max_bytes:
+            return
+        now = time.time()
+        try:
+            with self._transaction() as connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (url, body, etag, last_modified, ttl, now + ttl, now, len(body)))
+                self._evict(connection)
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f'Persistent cache write failed for {url}: {e}')
+
+    def touch(self, url: str, ttl: float):
+        """Renew the expiry of an entry after a successful revalidation."""
+        now = time.time()
+        try:
+            self.connection.execute(
+                'UPDATE responses SET ttl = ?, expires = ?, accessed = ? WHERE url = ?', (ttl, now + ttl, now, url))
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f'Persistent cache write failed for {url}: {e}')
+
+    def delete(self, url: str):
+        try:
+            self.connection.execute('DELETE FROM responses WHERE url = ?', (url,))
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f'Persistent cache write failed for {url}: {e}')
+
+    def clear(self):
+        try:
+            self.connection.execute('DELETE FROM responses')
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f'Persistent cache clear failed: {e}')
+
+    def _evict(self, connection):
+        (total,) = connection.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()
+        if total <= self.max_bytes:
+            return
+        freed = 0
+        for url, size in connection.execute('SELECT url, size FROM responses ORDER BY accessed').fetchall():
+            if total - freed <= self.max_bytes:
+                break
+            connection.execute('DELETE FROM responses WHERE url = ?', (url,))
+            freed += size
+
+    @contextmanager
+    def _transaction(self):
+        connection = self.connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
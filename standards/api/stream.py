@@ -0,0 +1,228 @@
+import codecs
+import json
+
+from jsonschema import Draft7Validator
+
+from standards.api.utils import (
+    errors_result,
+    get_context_url_from_request_body,
+    get_validator,
+    new_validator,
+    resolve_schema,
+    resolve_terms,
+    response_cache,
+    validate_data,
+    validator_cache
+)
+from standards.errors import UnprocessableEntityException, UnsupportedMediaTypeException
+
+_decoder = json.JSONDecoder()
+
+WHITESPACE = ' \t\n\r'
+# characters that can follow a complete value, anything else may continue it
+DELIMITERS = WHITESPACE + ',]}:'
+
+
+class JSONStreamReader:
+    """Reads a JSON document from a binary stream one value at a time.
+
+    Only the unparsed rest of the body read so far is buffered, so walking the
+    elements of an array with ``elements`` needs memory for one element at a time.
+
+        Args:
+            stream: Binary file-like object, e.g. ``request.stream``.
+            max_value_bytes (int): Longest single value that may be buffered.
+            chunk_size (int): Bytes read from the stream at once.
+    """
+    def __init__(self, stream, max_value_bytes: int, chunk_size=64 * 1024):
+        self.stream = stream
+        self.max_value_bytes = max_value_bytes
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it, ``''`` at the end."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill(self.chunk_size):
+                return ''
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f'Expecting one of {chars!r}')
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Parse and consume the next complete value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                value = end = None
+            # a number cut at the end of a chunk, e.g. ``1.`` or ``1e``, continues in the next one
+            if end is not None and (self.eof or (end < len(self.buffer) and self.buffer[end] in DELIMITERS)):
+                self.pos = end
+                return value
+
+            pending = len(self.buffer) - self.pos
+            if pending > self.max_value_bytes:
+                raise UnprocessableEntityException(
+                    f'A single JSON value can be at most {self.max_value_bytes} bytes.')
+            # read at least as much as is pending, so re-parsing stays linear overall
+            if not self._fill(max(self.chunk_size, pending)):
+                if end is None:
+                    raise ValueError('Incomplete or invalid JSON value')
+                self.pos = end
+                return value
+
+    def elements(self):
+        """Yield the values of the array starting at the current position."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(',]') == ']':
+                return
+
+    def end(self):
+        if self.peek():
+            raise ValueError('Extra data after the JSON document')
+
+    def _fill(self, size: int) -> bool:
+        if self.eof:
+            return False
+        self.buffer = self.buffer[self.pos:]
+        self.pos = 0
+        chunk = self.stream.read(size)
+        self.eof = not chunk
+        self.buffer += self._decoder.decode(chunk, final=self.eof)
+        return not self.eof
+
+
+def streamable_items(schema: dict) -> dict:
+    """Return the ``items`` subschema of ``data`` if every error of a document can be
+    found by validating its ``data`` elements one by one and the rest separately, else ``None``.
+
+    That holds when the root only checks ``type``, ``properties`` and ``required`` and
+    ``data`` only ``type`` and ``items``: none of them then reports on the array as a whole.
+    """
+    if not _only_keywords(schema, ('type', 'properties', 'required'), 'object'):
+        return None
+    data = schema.get('properties', {}).get('data')
+    if not _only_keywords(data, ('type', 'items'), 'array'):
+        return None
+    items = data.get('items')
+    if not isinstance(items, dict) or '$ref' in json.dumps(items):
+        # a $ref inside items would have to be resolved against the root schema
+        return None
+    return items
+
+
+def _only_keywords(schema, keywords: tuple, json_type: str) -> bool:
+    if not isinstance(schema, dict):
+        return False
+    for keyword in schema:
+        if keyword in Draft7Validator.VALIDATORS and keyword not in keywords:
+            return False
+    types = schema.get('type', json_type)
+    return json_type in ([types] if isinstance(types, str) else types)
+
+
+def items_validator(context_url: str):
+    schema_url, schema = resolve_schema(context_url)
+    items = streamable_items(schema)
+    if items is None:
+        return None
+    key = (schema_url, response_cache.digest(schema_url, schema), 'data/items')
+    return validator_cache.get_or_set(key, lambda: new_validator(items))
+
+
+def iter_document_errors(reader: JSONStreamReader):
+    """Yield the validation errors of the object read by reader, validating the elements
+    of its ``data`` array as they are parsed when the schema allows it and ``@context``
+    comes before ``data``. Errors carry the same paths as for the whole document, and
+    include the keys the context does not define when ``TERM_CHECK`` is on."""
+    reader.expect('{')
+    document = {}
+    if reader.peek() == '}':
+        reader.pos += 1
+    else:
+        while True:
+            key = reader.value()
+            if not isinstance(key, str):
+                raise ValueError('Expecting property name')
+            reader.expect(':')
+            validator = None
+            if key == 'data' and '@context' in document and reader.peek() == '[':
+                context_url = get_context_url_from_request_body(document)
+                validator = items_validator(context_url)
+            if validator is not None:
+                terms = resolve_terms(context_url)
+                for index, element in enumerate(reader.elements()):
+                    for error in validator.iter_errors(element):
+                        error.path.extendleft((index, 'data'))
+                        error.schema_path.extendleft(('items', 'data', 'properties'))
+                        yield error
+                    if terms is not None:
+                        yield from terms.iter_errors(element, 'data', ('data', index))
+                # the elements are checked, an empty array stands in for the rest
+                document[key] = []
+            else:
+                document[key] = reader.value()
+            if reader.expect(',}') == '}':
+                break
+    reader.end()
+
+    if not document:
+        raise UnsupportedMediaTypeException()
+    context_url = get_context_url_from_request_body(document)
+    validator = get_validator(*resolve_schema(context_url))
+    yield from validator.iter_errors(document)
+    terms = resolve_terms(context_url)
+    if terms is not None:
+        yield from terms.iter_errors(document)
+
+
+def iter_array_documents(stream, max_value_bytes: int):
+    """Yield the elements of the JSON array in stream as they are parsed. Malformed JSON
+    raises ``ValueError``."""
+    reader = JSONStreamReader(stream, max_value_bytes)
+    if reader.peek() != '[':
+        raise UnprocessableEntityException('The request body must be a JSON array of documents.')
+    yield from reader.elements()
+    reader.end()
+
+
+def validate_document_stream(stream, max_value_bytes: int, max_errors: int = None) -> dict:
+    """Validate a DataExample read incrementally from stream.
+
+        Args:
+            stream: Binary request body.
+            max_value_bytes (int): Longest single value that may be buffered.
+            max_errors (int): Error limit, see ``get_max_errors``.
+        Returns:
+            result (dict): ``{'isValid': 'True'}``, invalid documents raise
+                ``UnprocessableEntityException`` as ``/api/validate`` does.
+    """
+    reader = JSONStreamReader(stream, max_value_bytes)
+    try:
+        if reader.peek() != '{':
+            data = reader.value()
+            reader.end()
+            if not data:
+                raise UnsupportedMediaTypeException()
+            return validate_data(data, max_errors=max_errors)
+        return errors_result(iter_document_errors(reader), max_errors=max_errors)
+    except ValueError:
+        raise UnprocessableEntityException()
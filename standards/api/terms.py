@@ -0,0 +1,64 @@
+from jsonschema.exceptions import ValidationError
+
+
+class ContextTerms:
+    """Terms a JSON-LD ``@context`` defines, frozen for set lookups.
+
+    A document key is accepted if it is a JSON-LD keyword, a compact or absolute
+    IRI, or a term of the context. A term whose definition has ``@nest`` must
+    appear inside the object under its nesting property, as ``ContextRDFClass``
+    generates them. Checking a document costs one lookup per key.
+
+        Args:
+            terms (frozenset of str): Defined terms.
+            nests (dict of str: str): Nesting property of the terms that have one.
+            digest (str): Content hash of the context document.
+    """
+    __slots__ = ('terms', 'nests', 'digest')
+
+    def __init__(self, terms: frozenset, nests: dict, digest: str = None):
+        self.terms = terms
+        self.nests = nests
+        self.digest = digest
+
+    @classmethod
+    def from_context(cls, document: dict, digest: str = None) -> 'ContextTerms':
+        """Compile the ``@context`` of a context document, ``None`` if it is not an
+        inline object, e.g. a list of remote contexts."""
+        context = document.get('@context') if isinstance(document, dict) else None
+        if not isinstance(context, dict):
+            return None
+        terms = set()
+        nests = {}
+        for term, definition in context.items():
+            # keywords configure the context, a null definition removes the term
+            if term.startswith('@') or definition is None:
+                continue
+            terms.add(term)
+            if isinstance(definition, dict) and isinstance(definition.get('@nest'), str):
+                nests[term] = definition['@nest']
+        # a nesting property is accepted as a key even if the context does not alias it
+        terms.update(nests.values())
+        return cls(frozenset(terms), nests, digest)
+
+    def iter_errors(self, data, parent=None, path=()):
+        """Yield a ``ValidationError`` for every key of data, at any depth, that the
+        context does not define or that is outside its nesting property."""
+        if isinstance(data, list):
+            for index, item in enumerate(data):
+                yield from self.iter_errors(item, parent, path + (index,))
+            return
+        if not isinstance(data, dict):
+            return
+
+        for key, value in data.items():
+            # keywords, and compact or absolute IRIs, expand without a term
+            if key.startswith('@') or ':' in key:
+                continue
+            if key not in self.terms:
+                yield ValidationError(f'{key!r} is not defined in the @context', path=path + (key,))
+                continue
+            nest = self.nests.get(key)
+            if nest is not None and nest != parent:
+                yield ValidationError(f'{key!r} must be nested under {nest!r}', path=path + (key,))
+            yield from self.iter_errors(value, key, path + (key,))
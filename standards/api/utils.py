@@ -1,38 +1,115 @@
 import json
 import requests
 
-from copy import deepcopy
+from itertools import chain, islice
 from jsonschema import Draft7Validator
 from requests.exceptions import HTTPError
 
 from standards import app
+from standards.api import codec
+from standards.api.cache import LRUCache, ResponseCache, content_hash, shape_fingerprint
+from standards.api.client import AdmissionLimiter, AdmissionRejected, CircuitOpenError, UpstreamClient
+from standards.api.compiler import build_validator
+from standards.api.delta import DeltaStore
 from standards.api.genson import SchemaBuilder
-from standards.api.genson.utils import (
-    NestedDict,
-    schema_path_id_generator,
-    schema_sorted_first_level,
-    sorted_nested_dict
+from standards.api.store import PersistentCache
+from standards.api.terms import ContextTerms
+from standards.api.genson.schema.strategies.object import onto_generation
+from standards.api.genson.utils import emit_schema, iter_schema_json
+from standards.errors import (
+    BadRequestException,
+    BadRequestSyntaxException,
+    ServiceUnavailableException,
+    UnprocessableEntityException
+)
+
+VALIDATION_MODES = ('full', 'boolean', 'first')
+
+validator_cache = LRUCache(
+    maxsize=app.config['VALIDATOR_CACHE_SIZE'],
+    ttl=app.config['VALIDATOR_CACHE_TTL']
+)
+
+result_cache = LRUCache(
+    maxsize=app.config['RESULT_CACHE_SIZE'],
+    max_bytes=app.config['RESULT_CACHE_MAX_BYTES']
+)
+
+term_cache = LRUCache(
+    maxsize=app.config['VALIDATOR_CACHE_SIZE'],
+    ttl=app.config['VALIDATOR_CACHE_TTL']
+)
+
+schema_cache = LRUCache(
+    maxsize=app.config['SCHEMA_CACHE_SIZE'],
+    max_bytes=app.config['SCHEMA_CACHE_MAX_BYTES']
+)
+
+delta_store = DeltaStore(
+    maxsize=app.config['DELTA_CACHE_SIZE'],
+    max_bytes=app.config['DELTA_CACHE_MAX_BYTES']
+) if app.config['DELTA_VALIDATION'] else None
+
+upstream = UpstreamClient(
+    pool_size=app.config['UPSTREAM_POOL_SIZE'],
+    connect_timeout=app.config['UPSTREAM_CONNECT_TIMEOUT'],
+    read_timeout=app.config['UPSTREAM_READ_TIMEOUT'],
+    retries=app.config['UPSTREAM_RETRIES'],
+    backoff=app.config['UPSTREAM_BACKOFF'],
+    backoff_max=app.config['UPSTREAM_BACKOFF_MAX'],
+    hedge_after=app.config['UPSTREAM_HEDGE_AFTER'],
+    breaker_threshold=app.config['CIRCUIT_BREAKER_THRESHOLD'],
+    breaker_recovery=app.config['CIRCUIT_BREAKER_RECOVERY'],
+    breaker_hosts=app.config['CIRCUIT_BREAKER_HOSTS']
+)
+
+upstream_limiter = AdmissionLimiter(
+    max_concurrency=app.config['UPSTREAM_MAX_CONCURRENCY'],
+    max_queue=app.config['UPSTREAM_MAX_QUEUE'],
+    queue_timeout=app.config['UPSTREAM_QUEUE_TIMEOUT']
 )
-from standards.errors import UnprocessableEntityException, BadRequestException
 
 
 def make_request(method: str, url: str, **kwargs) -> requests.Response:
     try:
-        response = requests.request(method=method, url=url, **kwargs)
+        upstream_limiter.acquire()
+    except AdmissionRejected as e:
+        app.logger.warning(f'{e}, rejecting request for {url}')
+        raise ServiceUnavailableException(retry_after=app.config['UPSTREAM_RETRY_AFTER'])
+
+    try:
+        response = upstream.request(method=method, url=url, **kwargs)
         response.raise_for_status()
     except HTTPError as http_e:
         app.logger.error(http_e)
-        raise BadRequestException(f"Nothing matches the given URI: {str(http_e.response.url)}")
+        raise BadRequestException(f"Nothing matches the given URI: {str(http_e.response.url)}") from http_e
+    except CircuitOpenError as e:
+        app.logger.debug(e)
+        raise BadRequestException(f"Nothing matches the given URI: {url}") from e
     except Exception as e:
         app.logger.error(e)
-        raise BadRequestException(f"Nothing matches the given URI: {str(e.response.url)}")
+        raise BadRequestException(f"Nothing matches the given URI: {url}")
     else:
         return response
+    finally:
+        upstream_limiter.release()
+
+
+response_cache = ResponseCache(
+    request=make_request,
+    maxsize=app.config['HTTP_CACHE_SIZE'],
+    default_ttl=app.config['HTTP_CACHE_DEFAULT_TTL'],
+    store=PersistentCache(
+        path=app.config['PERSISTENT_CACHE_PATH'],
+        max_bytes=app.config['PERSISTENT_CACHE_MAX_BYTES']
+    ) if app.config['PERSISTENT_CACHE_PATH'] else None,
+    negative_ttl=app.config['NEGATIVE_CACHE_TTL']
+)
 
 
 def get_context(url: str) -> json:
     try:
-        context = make_request('GET', url).json()
+        context = response_cache.fetch(url).data
     except (ValueError, AttributeError) as e:
         app.logger.exception(
             f'The response body does not contain valid json: {e}')
@@ -42,7 +119,7 @@ def get_context(url: str) -> json:
 
 def get_schema(url: str) -> json:
     try:
-        schema = make_request('GET', url).json()
+        schema = response_cache.fetch(url).data
     except (ValueError, AttributeError) as e:
         app.logger.exception(
             f'The response body does not contain valid json: {e}')
@@ -72,28 +149,127 @@ def get_schema_url_from_context(data: dict) -> str:
         return schema_url
 
 
-def get_validation_errors(validator: Draft7Validator, data: json) -> dict:
-    errors = {}
-    for error in sorted(validator.iter_errors(data), key=str):
-        key = error.message.split()[0]
-        errors.update({key.replace("'", ""): error.message.replace(key, "").strip()})
-    return errors
-
-
-def validate_json(request):
-    data = request.get_json()
-
+def resolve_schema(context_url: str) -> tuple:
     # get context
-    context_url = get_context_url_from_request_body(data)
     context = get_context(context_url)
 
     # get schema
     schema_url = get_schema_url_from_context(context)
     schema = get_schema(schema_url)
 
-    v = Draft7Validator(schema)
+    return schema_url, schema
+
+
+def get_validator(schema_url: str, schema: json) -> Draft7Validator:
+    key = (schema_url, response_cache.digest(schema_url, schema))
+    return validator_cache.get_or_set(key, lambda: new_validator(schema))
+
+
+def new_validator(schema: json) -> Draft7Validator:
+    """Build the validator for schema, generated code unless ``COMPILED_VALIDATORS`` is off."""
+    return build_validator(schema, compiled=app.config['COMPILED_VALIDATORS'])
+
+
+def get_terms(context_url: str, context: json) -> ContextTerms:
+    digest = response_cache.digest(context_url, context)
+    return term_cache.get_or_set((context_url, digest), lambda: ContextTerms.from_context(context, digest))
+
+
+def resolve_terms(context_url: str) -> ContextTerms:
+    """Return the terms of the context for the ``TERM_CHECK``, ``None`` when it is off."""
+    if not app.config['TERM_CHECK']:
+        return None
+    return get_terms(context_url, get_context(context_url))
+
+
+def get_max_errors(args) -> int:
+    """Return the error limit selected by the ``mode`` and ``max_errors`` query arguments:
+    ``None`` collects every error, ``0`` only decides validity, ``N`` stops after N errors."""
+    mode = args.get('mode', 'full')
+    if mode not in VALIDATION_MODES:
+        raise BadRequestSyntaxException(f'mode must be one of: {", ".join(VALIDATION_MODES)}')
+    if mode == 'boolean':
+        return 0
+    if mode == 'first':
+        return 1
+
+    max_errors = args.get('max_errors')
+    if max_errors is None:
+        return None
+    try:
+        max_errors = int(max_errors)
+    except ValueError:
+        max_errors = 0
+    if max_errors < 1:
+        raise BadRequestSyntaxException('max_errors must be a positive integer')
+    return max_errors
+
+
+def get_stream_mode(args) -> bool:
+    """Whether the ``stream`` query argument asks for a chunked schema response."""
+    return args.get('stream', '').lower() in ('1', 'true', 'yes')
+
 
-    errors = get_validation_errors(validator=v, data=data)
+def get_validation_errors(validator: Draft7Validator, data: json, max_errors: int = None) -> dict:
+    return error_fields(validator.iter_errors(data), max_errors=max_errors)
+
+
+def error_fields(found, max_errors: int = None) -> dict:
+    """Reduce validation errors to the ``fields`` of a 422 response: one message per
+    leading word, as if updating a dict over the errors sorted by ``str``. Errors are
+    consumed one at a time and not kept, so ``found`` may be a lazy stream."""
+    if max_errors is not None:
+        found = islice(found, max_errors)
+    # by key: the smallest error text, which orders the keys, the largest error text
+    # and the message that comes with it, which is the value that wins
+    fields = {}
+    for error in found:
+        text = str(error)
+        word = error.message.split()[0]
+        key = word.replace("'", "")
+        message = error.message.replace(word, "").strip()
+        field = fields.get(key)
+        if field is None:
+            fields[key] = [text, text, message]
+            continue
+        if text < field[0]:
+            field[0] = text
+        if text >= field[1]:
+            field[1], field[2] = text, message
+    return {key: message for key, (_, _, message) in sorted(fields.items(), key=lambda item: item[1][0])}
+
+
+def validate_json(request):
+    return validate_data(request.get_json(), max_errors=get_max_errors(request.args))
+
+
+def validate_data(data: json, max_errors: int = None) -> dict:
+    context_url = get_context_url_from_request_body(data)
+    schema_url, schema = resolve_schema(context_url)
+
+    v = get_validator(schema_url, schema)
+    digest = response_cache.digest(schema_url, schema)
+    terms = resolve_terms(context_url)
+
+    return memoized_result(digest=digest, validator=v, data=data, max_errors=max_errors, terms=terms)
+
+
+def validation_result(validator: Draft7Validator, data: json, max_errors: int = None,
+                      terms: ContextTerms = None) -> dict:
+    found = validator.iter_errors(data)
+    if terms is not None:
+        found = chain(found, terms.iter_errors(data))
+    return errors_result(found, max_errors=max_errors)
+
+
+def errors_result(found, max_errors: int = None) -> dict:
+    """Answer a validation from its (lazy) validation errors, see ``get_max_errors``."""
+    if max_errors == 0:
+        if next(iter(found), None) is not None:
+            raise UnprocessableEntityException(message='One or more fields raised validation errors')
+        return {'isValid': 'True'}
+
+    errors = error_fields(found, max_errors=max_errors)
     if errors:
         raise UnprocessableEntityException(
             message='One or more fields raised validation errors',
@@ -103,22 +279,130 @@ def validate_json(request):
     return {'isValid': 'True'}
 
 
+def memoized_result(digest: str, validator: Draft7Validator, data: json, max_errors: int = None,
+                    terms: ContextTerms = None) -> dict:
+    """Same as ``validation_result``, but reuses the outcome for a payload already validated
+    against the schema with content hash ``digest``. Payloads are compared by their
+    canonical hash, so a resend with reordered keys is answered from the cache too."""
+    if not result_cache.maxsize:
+        return errors_result(document_errors(digest, validator, data, terms), max_errors=max_errors)
+
+    key = (digest, terms and terms.digest, content_hash(data), max_errors)
+    outcome = result_cache.get(key)
+    if outcome is None:
+        try:
+            outcome = errors_result(document_errors(digest, validator, data, terms), max_errors=max_errors)
+        except UnprocessableEntityException as e:
+            # keep message and fields only, the exception would pin the payload via its traceback
+            outcome = (e.message, e.payload)
+        # the fixed part approximates the key and container overhead
+        result_cache.set(key, outcome, size=256 + len(json.dumps(outcome)))
+
+    if isinstance(outcome, tuple):
+        message, payload = outcome
+        raise UnprocessableEntityException(message=message, payload=payload)
+    return dict(outcome)
+
+
+def document_errors(digest: str, validator: Draft7Validator, data: json, terms: ContextTerms = None):
+    """Validation errors of data, only re-validating what changed since the last valid
+    version with the same ``@id`` when ``DELTA_VALIDATION`` is on, followed by the keys
+    the context does not define if ``terms`` are given."""
+    if delta_store is None:
+        errors = validator.iter_errors(data)
+    else:
+        errors = delta_store.iter_errors(digest, validator, data)
+    if terms is not None:
+        errors = chain(errors, terms.iter_errors(data))
+    return errors
+
+
+def get_stats() -> dict:
+    stats = {
+        'validators': validator_cache.stats(),
+        'results': result_cache.stats(),
+        'schemas': schema_cache.stats(),
+        'responses': response_cache.stats(),
+        'upstream': upstream_limiter.stats()
+    }
+    if delta_store is not None:
+        stats['deltas'] = delta_store.stats()
+    return stats
+
+
 def schema_generator(request):
-    data = request.get_json()
+    return generate_schema(request.get_json())
 
-    builder = SchemaBuilder('http://json-schema.org/draft-06/schema#')
-    builder.add_object(data)
 
-    schema = json.loads(builder.to_json(indent=4))
+def generate_schema(data: json) -> dict:
+    """Same as ``build_schema``, but reuses the schema generated for an earlier DataExample
+    with the same ``@context`` and structure, see ``shape_fingerprint``, as long as the
+    ontology has not been reloaded since."""
+    if not schema_cache.maxsize:
+        return build_schema(data)
 
     context_url = get_context_url_from_request_body(data)
+    # the generation is read first, a schema built across a reload is filed under the old one
+    key = (context_url, shape_fingerprint(data), onto_generation())
+    schema = schema_cache.get(key)
+    if schema is None:
+        schema = build_schema(data)
+        dump = codec.dumps(schema, separators=(',', ':'), ensure_ascii=False)
+        schema_cache.set(key, schema, size=256 + len(key[1]) + len(dump))
+    return schema
+
+
+def build_schema(data: json) -> dict:
+    return build_merged_schema([data])
+
+
+def build_merged_schema(examples) -> dict:
+    """Generate one schema covering every DataExample of examples.
 
-    schema['$id'] = context_url.replace("Context", "Schema")[:-1]
-    schema['properties']['@context']['const'] = context_url
+    Examples are added to a single ``SchemaBuilder`` as they are taken from the
+    iterable, so a generator reading a request body keeps one example in memory.
 
-    nested_dict = NestedDict(deepcopy(schema))
-    schema_path_id_generator(schema, nested_dict)
-    nested_dict = schema_sorted_first_level(nested_dict)
-    nested_dict = sorted_nested_dict(nested_dict)
+        Args:
+            examples (Iterable[dict]): DataExamples sharing one ``@context``.
+        Returns:
+            schema (dict): Annotated schema, as ``/api/schema`` returns it.
+        Raises:
+            UnprocessableEntityException: no examples, or an ``@context`` differs from the first.
+    """
+    return emit_schema(*schema_builder(examples))
+
+
+def stream_merged_schema(examples, chunk_size: int = 64 * 1024):
+    """Same as ``build_merged_schema``, but return the schema as chunks of the JSON text
+    ``jsonify`` would write, generated from the node tree while they are consumed.
+
+    The examples are read, and errors raised, before the first chunk is taken.
+    """
+    builder, schema_id, constants = schema_builder(examples)
+
+    def dumps(value):
+        return codec.dumps(value, separators=(',', ':'), ensure_ascii=app.config['JSON_AS_ASCII'])
+
+    return chain(iter_schema_json(builder, schema_id, constants, dumps, chunk_size), ('\n',))
+
+
+def schema_builder(examples) -> tuple:
+    """Add examples to a ``SchemaBuilder``, see ``build_merged_schema``.
+
+        Returns:
+            builder (SchemaBuilder), schema_id (str), constants (dict): Arguments of ``emit_schema``.
+    """
+    builder = SchemaBuilder('http://json-schema.org/draft-06/schema#')
+    context_url = None
+    for data in examples:
+        url = get_context_url_from_request_body(data)
+        if context_url is None:
+            context_url = url
+        elif url != context_url:
+            raise UnprocessableEntityException(f'Every DataExample must have the @context {context_url}.')
+        builder.add_object(data)
+    if context_url is None:
+        raise UnprocessableEntityException('The request body must contain at least one DataExample.')
 
-    return nested_dict
+    schema_id = context_url.replace("Context", "Schema")[:-1]
+    return builder, schema_id, {('properties', '@context'): context_url}
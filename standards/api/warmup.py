@@ -0,0 +1,82 @@
+import threading
+import time
+
+from standards import app
+from standards.api.registry import reload_ontology
+from standards.api.utils import get_schema_url_from_context, get_validator, response_cache
+
+
+def warm_context(context_url: str, margin=None):
+    """Pin a context and its schema in the response cache and compile the validator.
+
+        Args:
+            context_url (str): Url of the ``@context`` document.
+            margin (float): If given, only revalidate documents that expire
+                within this many seconds instead of fetching them.
+    """
+    if margin is None:
+        context = response_cache.pin(context_url).data
+    else:
+        context = response_cache.refresh(context_url, margin).data
+
+    schema_url = get_schema_url_from_context(context)
+    if margin is None:
+        schema = response_cache.pin(schema_url).data
+    else:
+        schema = response_cache.refresh(schema_url, margin).data
+
+    get_validator(schema_url, schema)
+
+
+def warm_up(context_urls):
+    for context_url in context_urls:
+        try:
+            warm_context(context_url)
+        except Exception as e:
+            app.logger.error(f'Warm-up of {context_url} failed: {e}')
+
+
+class Refresher(threading.Thread):
+    """Daemon thread renewing warm contexts and schemas before they expire,
+    so request threads never fetch or compile them on the critical path.
+    With ``reload_interval`` it also re-reads the ontology, see ``reload_ontology``,
+    on the first tick that many seconds after the previous read."""
+    def __init__(self, context_urls, interval=30, reload_interval=0):
+        super().__init__(name='warmup-refresher', daemon=True)
+        self.context_urls = list(context_urls)
+        self.interval = interval
+        self.reload_interval = reload_interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        reloaded = time.monotonic()
+        while not self.stopped.wait(self.interval):
+            if self.reload_interval and time.monotonic() - reloaded >= self.reload_interval:
+                reloaded = time.monotonic()
+                try:
+                    reload_ontology()
+                except Exception as e:
+                    app.logger.error(f'Reload of the ontology failed: {e}')
+            for context_url in self.context_urls:
+                try:
+                    warm_context(context_url, margin=self.interval)
+                except Exception as e:
+                    app.logger.error(f'Refresh of {context_url} failed: {e}')
+
+    def stop(self):
+        self.stopped.set()
+
+
+def start_warmup():
+    context_urls = app.config['WARMUP_CONTEXTS']
+    reload_interval = app.config['ONTOLOGY_RELOAD_INTERVAL']
+    if not context_urls and not reload_interval:
+        return None
+    warm_up(context_urls)
+    refresher = Refresher(
+        context_urls,
+        interval=app.config['WARMUP_REFRESH_INTERVAL'],
+        reload_interval=reload_interval
+    )
+    refresher.start()
+    return refresher
@@ -0,0 +1,146 @@
+"""ASGI entry point serving ``/api/validate`` and ``/api/schema`` without blocking on upstream I/O.
+
+Run it with an ASGI server next to the WSGI ``manage:app``, e.g.
+``uvicorn asgi:app`` or ``gunicorn -k uvicorn.workers.UvicornWorker asgi:app``.
+Responses and errors are the same as the Flask endpoints return.
+"""
+import io
+from collections.abc import Iterator
+from urllib.parse import parse_qsl
+
+from werkzeug.http import parse_accept_header
+
+from standards import app as flask_app
+from standards.api import codec
+from standards.api.aio import async_upstream, validate_data
+from standards.api.compression import compress, decompressing_stream, negotiate_encoding
+from standards.api.utils import generate_schema, get_max_errors, get_stream_mode, stream_merged_schema
+from standards.errors import (
+    BadRequestException,
+    BadRequestSyntaxException,
+    ServiceUnavailableException,
+    UnprocessableEntityException,
+    UnsupportedMediaTypeException
+)
+from standards.errors.errors import BaseException as APIException
+
+
+async def validate(data, args):
+    return await validate_data(data, max_errors=get_max_errors(args))
+
+
+async def build_schema(data, args):
+    if get_stream_mode(args):
+        return stream_merged_schema([data], flask_app.config['SCHEMA_STREAM_CHUNK_BYTES'])
+    return generate_schema(data)
+
+
+ROUTES = {
+    '/api/validate': validate,
+    '/api/schema': build_schema
+}
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    headers = {}
+    try:
+        view = ROUTES.get(scope['path'].rstrip('/'))
+        if view is None:
+            raise BadRequestException()
+        if scope['method'] != 'POST':
+            raise BadRequestSyntaxException()
+        args = dict(parse_qsl(scope.get('query_string', b'').decode('latin-1')))
+        data = parse_json_body(scope, decode_body(scope, await read_body(receive)))
+        status, payload = 200, await view(data, args)
+    except APIException as error:
+        status, payload = error.status_code, error.to_dict()
+        if isinstance(error, ServiceUnavailableException):
+            headers['Retry-After'] = str(error.retry_after)
+    except Exception as e:
+        flask_app.logger.exception(e)
+        status, payload = 500, {'error': {'status': 500, 'error': 'INTERNAL_SERVER_ERROR'}}
+
+    if isinstance(payload, Iterator):
+        await send_chunks(send, payload)
+        return
+    accept_encoding = dict(scope['headers']).get(b'accept-encoding', b'').decode('latin-1')
+    await send_json(send, status, payload, headers, accept_encoding)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await async_upstream.aclose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def read_body(receive) -> bytes:
+    chunks = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        more_body = message.get('more_body', False)
+    return b''.join(chunks)
+
+
+def decode_body(scope, body: bytes) -> bytes:
+    content_encoding = dict(scope['headers']).get(b'content-encoding', b'').decode('latin-1')
+    if not content_encoding:
+        return body
+    stream = decompressing_stream(io.BytesIO(body), content_encoding, flask_app.config['MAX_DECOMPRESSED_BYTES'])
+    return stream.read()
+
+
+def parse_json_body(scope, body: bytes):
+    """Mirror the Flask views: a non-json content type or an empty document is
+    unsupported, a json content type with a malformed body is unprocessable."""
+    content_type = dict(scope['headers']).get(b'content-type', b'').decode('latin-1')
+    mimetype = content_type.split(';')[0].strip().lower()
+    if mimetype != 'application/json' and not (mimetype.startswith('application/') and mimetype.endswith('+json')):
+        flask_app.logger.error(f'Entity body format {body} is not supported')
+        raise UnsupportedMediaTypeException()
+    try:
+        data = codec.loads(body)
+    except ValueError:
+        raise UnprocessableEntityException()
+    if not data:
+        flask_app.logger.error(f'Entity body format {body} is not supported')
+        raise UnsupportedMediaTypeException()
+    return data
+
+
+async def send_json(send, status: int, payload, headers=None, accept_encoding=''):
+    body = (codec.dumps(payload, separators=(',', ':')) + '\n').encode('utf-8')
+    headers = dict(headers or {}, Vary='Accept-Encoding')
+    encoding = negotiate_encoding(parse_accept_header(accept_encoding or None))
+    if encoding is not None and len(body) >= flask_app.config['COMPRESS_MIN_BYTES']:
+        body = compress(body, encoding, flask_app.config['COMPRESS_LEVEL'])
+        headers['Content-Encoding'] = encoding
+    raw_headers = [
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(body)).encode('latin-1'))
+    ]
+    for name, value in headers.items():
+        raw_headers.append((name.lower().encode('latin-1'), value.encode('latin-1')))
+    await send({'type': 'http.response.start', 'status': status, 'headers': raw_headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_chunks(send, chunks):
+    """Send the chunks of a streamed json response as they are generated, uncompressed
+    like the streamed responses of the Flask endpoints."""
+    await send({'type': 'http.response.start', 'status': 200, 'headers': [(b'content-type', b'application/json')]})
+    for chunk in chunks:
+        await send({'type': 'http.response.body', 'body': chunk.encode('utf-8'), 'more_body': True})
+    await send({'type': 'http.response.body', 'body': b''})
@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 
 basedir = os.path.abspath(os.path.dirname(__file__))
@@ -6,6 +7,95 @@ basedir = os.path.abspath(os.path.dirname(__file__))
 
 class Config(object):
     JSON_SORT_KEYS = False
+    # orjson parses requests and serializes responses when installed, json forces the standard library
+    JSON_CODEC = os.getenv('JSON_CODEC', 'orjson')
+
+    # Compiled Draft7Validator instances, keyed by schema url and content hash
+    VALIDATOR_CACHE_SIZE = int(os.getenv('VALIDATOR_CACHE_SIZE', 64))
+    VALIDATOR_CACHE_TTL = float(os.getenv('VALIDATOR_CACHE_TTL', 3600))
+
+    # Generate Python code for schemas using only type/const/enum/minLength/properties/required
+    COMPILED_VALIDATORS = os.getenv('COMPILED_VALIDATORS', 'true').lower() in ('1', 'true', 'yes')
+
+    # Outcomes of /api/validate by schema hash and canonical payload hash, 0 disables
+    RESULT_CACHE_SIZE = int(os.getenv('RESULT_CACHE_SIZE', 4096))
+    RESULT_CACHE_MAX_BYTES = int(os.getenv('RESULT_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+
+    # /api/schema results by @context and key structure of the DataExample, 0 disables
+    SCHEMA_CACHE_SIZE = int(os.getenv('SCHEMA_CACHE_SIZE', 256))
+    SCHEMA_CACHE_MAX_BYTES = int(os.getenv('SCHEMA_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+
+    # /api/schema?stream=true: size of the chunks the schema is written in
+    SCHEMA_STREAM_CHUNK_BYTES = int(os.getenv('SCHEMA_STREAM_CHUNK_BYTES', 64 * 1024))
+
+    # Report document keys the resolved @context does not define
+    TERM_CHECK = os.getenv('TERM_CHECK', '').lower() in ('1', 'true', 'yes')
+
+    # Re-validate only the changed parts of a document whose @id was last seen valid
+    DELTA_VALIDATION = os.getenv('DELTA_VALIDATION', '').lower() in ('1', 'true', 'yes')
+    DELTA_CACHE_SIZE = int(os.getenv('DELTA_CACHE_SIZE', 1024))
+    DELTA_CACHE_MAX_BYTES = int(os.getenv('DELTA_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+    # Fetched contexts and schemas; DEFAULT_TTL applies when upstream sends no Cache-Control
+    HTTP_CACHE_SIZE = int(os.getenv('HTTP_CACHE_SIZE', 256))
+    HTTP_CACHE_DEFAULT_TTL = float(os.getenv('HTTP_CACHE_DEFAULT_TTL', 60))
+    # 404/410 and invalid json responses are remembered for this many seconds
+    NEGATIVE_CACHE_TTL = float(os.getenv('NEGATIVE_CACHE_TTL', 30))
+
+    # Response bodies shared by all workers on the node, an empty path disables it
+    PERSISTENT_CACHE_PATH = os.getenv(
+        'PERSISTENT_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'ontology-api', 'responses.sqlite3'))
+    PERSISTENT_CACHE_MAX_BYTES = int(os.getenv('PERSISTENT_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+    # Serve @context and @schema urls under REGISTRY_BASE_URL from the loaded ontology
+    REGISTRY_MODE = os.getenv('REGISTRY_MODE', '').lower() in ('1', 'true', 'yes')
+    REGISTRY_BASE_URL = os.getenv('REGISTRY_BASE_URL', 'https://standards.oftrust.net/v2/')
+
+    # Comma separated @context urls fetched and compiled at boot and kept warm in the background
+    WARMUP_CONTEXTS = [url.strip() for url in os.getenv('WARMUP_CONTEXTS', '').split(',') if url.strip()]
+    WARMUP_REFRESH_INTERVAL = float(os.getenv('WARMUP_REFRESH_INTERVAL', 30))
+    # Seconds between re-reads of the ontology by the refresher thread, 0 disables
+    ONTOLOGY_RELOAD_INTERVAL = float(os.getenv('ONTOLOGY_RELOAD_INTERVAL', 0))
+
+    # Pooled client for the standards host; UPSTREAM_HEDGE_AFTER enables hedged GETs
+    UPSTREAM_POOL_SIZE = int(os.getenv('UPSTREAM_POOL_SIZE', 10))
+    UPSTREAM_CONNECT_TIMEOUT = float(os.getenv('UPSTREAM_CONNECT_TIMEOUT', 3.05))
+    UPSTREAM_READ_TIMEOUT = float(os.getenv('UPSTREAM_READ_TIMEOUT', 10))
+    UPSTREAM_RETRIES = int(os.getenv('UPSTREAM_RETRIES', 2))
+    UPSTREAM_BACKOFF = float(os.getenv('UPSTREAM_BACKOFF', 0.1))
+    UPSTREAM_BACKOFF_MAX = float(os.getenv('UPSTREAM_BACKOFF_MAX', 1.0))
+    UPSTREAM_HEDGE_AFTER = float(os.getenv('UPSTREAM_HEDGE_AFTER')) if os.getenv('UPSTREAM_HEDGE_AFTER') else None
+
+    # Admission control for upstream fetches, rejected requests get a 503 with Retry-After
+    UPSTREAM_MAX_CONCURRENCY = int(os.getenv('UPSTREAM_MAX_CONCURRENCY', 8))
+    UPSTREAM_MAX_QUEUE = int(os.getenv('UPSTREAM_MAX_QUEUE', 16))
+    UPSTREAM_QUEUE_TIMEOUT = float(os.getenv('UPSTREAM_QUEUE_TIMEOUT', 2.0))
+    UPSTREAM_RETRY_AFTER = int(os.getenv('UPSTREAM_RETRY_AFTER', 1))
+
+    # Per-host circuit breaker, a threshold of 0 disables it; breakers of the least
+    # recently used hosts beyond CIRCUIT_BREAKER_HOSTS are dropped
+    CIRCUIT_BREAKER_THRESHOLD = int(os.getenv('CIRCUIT_BREAKER_THRESHOLD', 5))
+    CIRCUIT_BREAKER_RECOVERY = float(os.getenv('CIRCUIT_BREAKER_RECOVERY', 30))
+    CIRCUIT_BREAKER_HOSTS = int(os.getenv('CIRCUIT_BREAKER_HOSTS', 256))
+
+    # /api/validate/batch: documents per request, validation processes (0 validates
+    # in process), documents per pool task and the batch size that uses the pool
+    BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', 1000))
+    BATCH_PROCESSES = int(os.getenv('BATCH_PROCESSES', os.cpu_count() or 1))
+    BATCH_CHUNK_SIZE = int(os.getenv('BATCH_CHUNK_SIZE', 100))
+    BATCH_POOL_MIN_ITEMS = int(os.getenv('BATCH_POOL_MIN_ITEMS', 200))
+
+    # gzip/deflate request bodies and negotiated compression of responses from COMPRESS_MIN_BYTES
+    MAX_DECOMPRESSED_BYTES = int(os.getenv('MAX_DECOMPRESSED_BYTES', 64 * 1024 * 1024))
+    COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', 1024))
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))
+
+    # /api/validate/ndjson: longest accepted document line
+    NDJSON_MAX_LINE_BYTES = int(os.getenv('NDJSON_MAX_LINE_BYTES', 16 * 1024 * 1024))
+
+    # /api/validate/stream: largest single value, e.g. one data element, held in memory
+    STREAM_MAX_VALUE_BYTES = int(os.getenv('STREAM_MAX_VALUE_BYTES', 16 * 1024 * 1024))
+
     LOGGING_CONFIG = {
         'version': 1,
         'formatters': {'default': {
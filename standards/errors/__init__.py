@@ -4,7 +4,9 @@ from standards.errors.errors import (
     BadRequestException,
     UnprocessableEntityException,
     UnsupportedMediaTypeException,
-    BadRequestSyntaxException
+    BadRequestSyntaxException,
+    PayloadTooLargeException,
+    ServiceUnavailableException
 )
 
 
@@ -35,3 +37,17 @@ def handle_bad_request_exception(error):
     response.status_code = error.status_code
     return response
 
+
+@app.errorhandler(PayloadTooLargeException)
+def handle_bad_request_exception(error):
+    response = jsonify(error.to_dict())
+    response.status_code = error.status_code
+    return response
+
+
+@app.errorhandler(ServiceUnavailableException)
+def handle_bad_request_exception(error):
+    response = jsonify(error.to_dict())
+    response.status_code = error.status_code
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
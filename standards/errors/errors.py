@@ -42,3 +42,14 @@ class UnsupportedMediaTypeException(BaseException):
 class BadRequestSyntaxException(BaseException):
     def __init__(self, message="Bad request syntax or unsupported method", status_code=400):
         super().__init__(message=message, status_code=status_code)
+
+
+class PayloadTooLargeException(BaseException):
+    def __init__(self, message="Request entity is larger than the server is willing to process.", status_code=413):
+        super().__init__(message=message, status_code=status_code)
+
+
+class ServiceUnavailableException(BaseException):
+    def __init__(self, message="Service is temporarily overloaded, retry later.", status_code=503, retry_after=1):
+        super().__init__(message=message, status_code=status_code)
+        self.retry_after = retry_after
@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+# the tests run offline: no ontology download, no cache shared with running workers
+os.environ.setdefault('ONTO_BASE', 'https://standards-ontotest.oftrust.net/')
+os.environ['PERSISTENT_CACHE_PATH'] = ''
+
+from owlready2.namespace import Ontology  # noqa: E402
+
+Ontology.load = lambda self, *args, **kwargs: self
+
+from standards import app  # noqa: E402
+from tests.stub import StubServer  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def stub_server():
+    server = StubServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def stub(stub_server):
+    stub_server.reset()
+    yield stub_server
+    stub_server.reset()
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
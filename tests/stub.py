@@ -0,0 +1,82 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubServer:
+    """Local HTTP server standing in for the standards host.
+
+    ``documents`` maps a path to a json document, or to a ``(body, headers)`` or
+    ``(body, headers, status)`` tuple where body is a json document or raw bytes.
+    A request whose ``If-None-Match`` matches the ``ETag``, or whose ``If-Modified-Since``
+    equals the ``Last-Modified`` of the document, gets a ``304 Not Modified``.
+    Every request is recorded in ``requests`` as a ``(path, headers)`` pair.
+    """
+    def __init__(self):
+        self.documents = {}
+        self.requests = []
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.base_url = f'http://127.0.0.1:{self._server.server_address[1]}'
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    def hits(self, path: str) -> list:
+        return [headers for requested, headers in self.requests if requested == path]
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset(self):
+        self.documents.clear()
+        self.requests.clear()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                stub.requests.append((self.path, dict(self.headers)))
+                document = stub.documents.get(self.path)
+                if document is None:
+                    self._send(404, b'Not Found', {})
+                    return
+                if not isinstance(document, tuple):
+                    document = (document, {})
+                body, headers, status = (document + (200,))[:3]
+                etag, last_modified = headers.get('ETag'), headers.get('Last-Modified')
+                if (etag and self.headers.get('If-None-Match') == etag) or (
+                        last_modified and self.headers.get('If-Modified-Since') == last_modified):
+                    self._send(304, b'', {key: value for key, value in headers.items() if key != 'Content-Type'})
+                    return
+                if not isinstance(body, bytes):
+                    body = json.dumps(body).encode('utf-8')
+                self._send(status, body, dict({'Content-Type': 'application/json'}, **headers))
+
+            def _send(self, status: int, body: bytes, headers: dict):
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                if status != 304:
+                    self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if status != 304:
+                    self.wfile.write(body)
+
+        return Handler
+
+
+def serve_context(stub, name: str, schema: dict, headers: dict = None):
+    """Serve a Context at ``/v2/Context/<name>/`` pointing to schema at ``/v2/Schema/<name>``
+    and return the context url."""
+    stub.documents[f'/v2/Schema/{name}'] = (schema, headers or {})
+    stub.documents[f'/v2/Context/{name}/'] = (
+        {'@context': {'@schema': stub.url(f'/v2/Schema/{name}')}}, headers or {})
+    return stub.url(f'/v2/Context/{name}/')
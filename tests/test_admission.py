@@ -0,0 +1,161 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from standards import app
+from standards.api import aio, utils
+from standards.api.client import AdmissionLimiter, AdmissionRejected
+from standards.asgi import app as asgi_app
+from tests.stub import serve_context
+
+SCHEMA = {'type': 'object', 'properties': {'@context': {'type': 'string'}}}
+
+
+def acquire_in_thread(limiter):
+    """Start a thread waiting for a slot, return it and the list its outcome goes to."""
+    outcome = []
+
+    def acquire():
+        try:
+            limiter.acquire()
+        except AdmissionRejected as e:
+            outcome.append(e)
+        else:
+            outcome.append('admitted')
+
+    thread = threading.Thread(target=acquire)
+    thread.start()
+    while limiter.stats()['waiting'] == 0 and not outcome:
+        time.sleep(0.001)
+    return thread, outcome
+
+
+def test_callers_within_the_concurrency_are_admitted_at_once():
+    limiter = AdmissionLimiter(max_concurrency=2, max_queue=0, queue_timeout=5)
+
+    limiter.acquire()
+    limiter.acquire()
+
+    assert limiter.stats()['active'] == 2
+    assert limiter.stats()['admitted'] == 2
+
+
+def test_a_saturated_limiter_queues_until_a_slot_is_released():
+    limiter = AdmissionLimiter(max_concurrency=1, max_queue=1, queue_timeout=5)
+    limiter.acquire()
+
+    thread, outcome = acquire_in_thread(limiter)
+    assert outcome == []
+    assert limiter.stats()['waiting'] == 1
+    limiter.release()
+    thread.join(5)
+
+    assert outcome == ['admitted']
+    stats = limiter.stats()
+    assert (stats['active'], stats['waiting'], stats['admitted'], stats['rejected']) == (1, 0, 2, 0)
+    assert stats['queue_wait_seconds'] > 0
+
+
+def test_callers_beyond_the_queue_are_rejected_at_once():
+    limiter = AdmissionLimiter(max_concurrency=1, max_queue=1, queue_timeout=5)
+    limiter.acquire()
+    thread, outcome = acquire_in_thread(limiter)
+
+    started = time.monotonic()
+    with pytest.raises(AdmissionRejected):
+        limiter.acquire()
+
+    assert time.monotonic() - started < 1
+    assert limiter.stats()['rejected'] == 1
+    limiter.release()
+    thread.join(5)
+    assert outcome == ['admitted']
+
+
+def test_callers_are_rejected_after_the_queue_timeout():
+    limiter = AdmissionLimiter(max_concurrency=1, max_queue=4, queue_timeout=0.05)
+    limiter.acquire()
+
+    with pytest.raises(AdmissionRejected):
+        limiter.acquire()
+
+    stats = limiter.stats()
+    assert (stats['active'], stats['waiting'], stats['rejected']) == (1, 0, 1)
+    assert stats['queue_wait_seconds'] >= 0.05
+
+
+def test_a_new_caller_does_not_overtake_the_queue():
+    limiter = AdmissionLimiter(max_concurrency=1, max_queue=1, queue_timeout=0.2)
+    limiter.acquire()
+    thread, outcome = acquire_in_thread(limiter)
+    limiter.release()
+    thread.join(5)
+
+    assert outcome == ['admitted']
+    with pytest.raises(AdmissionRejected):
+        # the slot went to the caller that waited
+        limiter.acquire()
+
+
+def test_the_context_manager_releases_the_slot():
+    limiter = AdmissionLimiter(max_concurrency=1, max_queue=0)
+
+    with pytest.raises(RuntimeError):
+        with limiter:
+            raise RuntimeError()
+
+    assert limiter.stats()['active'] == 0
+    with limiter:
+        assert limiter.stats()['active'] == 1
+
+
+def test_wsgi_answers_a_rejected_fetch_with_503_and_retry_after(stub, client, monkeypatch):
+    context_url = serve_context(stub, 'Saturated', SCHEMA)
+    limiter = AdmissionLimiter(max_concurrency=1, max_queue=0)
+    limiter.acquire()
+    monkeypatch.setattr(utils, 'upstream_limiter', limiter)
+    monkeypatch.setitem(app.config, 'UPSTREAM_RETRY_AFTER', 7)
+
+    response = client.post('/api/validate', json={'@context': context_url, 'data': {}})
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '7'
+    assert response.get_json()['error']['status'] == 503
+    assert stub.hits('/v2/Context/Saturated/') == []
+
+    # not remembered as a failure, the next request goes upstream
+    limiter.release()
+    assert client.post('/api/validate', json={'@context': context_url, 'data': {}}).status_code == 200
+
+
+async def call_asgi(path: str, body: bytes):
+    scope = {'type': 'http', 'method': 'POST', 'path': path, 'query_string': b'',
+             'headers': [(b'content-type', b'application/json')]}
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await asgi_app(scope, receive, send)
+    return sent[0]['status'], dict(sent[0]['headers'])
+
+
+def test_asgi_answers_a_pool_timeout_with_503_and_retry_after(stub, monkeypatch):
+    context_url = serve_context(stub, 'PoolTimeout', SCHEMA)
+    monkeypatch.setitem(app.config, 'UPSTREAM_RETRY_AFTER', 7)
+
+    async def no_connection(method, url, **kwargs):
+        raise httpx.PoolTimeout('no connection available')
+
+    monkeypatch.setattr(aio.async_upstream, '_request', no_connection)
+    status, headers = asyncio.run(call_asgi('/api/validate', b'{"@context": "%s", "data": {}}' % context_url.encode()))
+
+    assert status == 503
+    assert headers[b'retry-after'] == b'7'
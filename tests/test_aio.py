@@ -0,0 +1,133 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from standards.api.aio import AsyncResponseCache, AsyncUpstreamClient
+from standards.api.cache import CachedResponse, ResponseCache
+from standards.api.client import CircuitBreaker, UpstreamClient
+from standards.api.store import PersistentCache
+from standards.asgi import app as asgi_app
+from tests.stub import serve_context
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {'@context': {'type': 'string'}, 'data': {'type': 'object', 'required': ['name']}},
+    'required': ['@context', 'data']
+}
+
+
+async def call_asgi(path: str, body: bytes):
+    scope = {'type': 'http', 'method': 'POST', 'path': path, 'query_string': b'',
+             'headers': [(b'content-type', b'application/json')]}
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await asgi_app(scope, receive, send)
+    return sent[0]['status'], b''.join(message.get('body', b'') for message in sent[1:])
+
+
+def test_pool_timeout_of_a_probe_reopens_the_circuit():
+    client = AsyncUpstreamClient(UpstreamClient(retries=0, breaker_threshold=1, breaker_recovery=0))
+    breaker = client.sync_client.breaker('http://upstream.test/doc')
+    breaker.record_failure()
+
+    async def no_connection(method, url, **kwargs):
+        raise httpx.PoolTimeout('no connection available')
+
+    client._request = no_connection
+    with pytest.raises(httpx.PoolTimeout):
+        asyncio.run(client.request('GET', 'http://upstream.test/doc'))
+
+    assert breaker.state == CircuitBreaker.OPEN
+    # the recovery time has passed, the next call probes again
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_waiters_fetch_again_when_the_leading_fetch_is_cancelled():
+    cache = AsyncResponseCache(ResponseCache(request=None))
+    calls = []
+
+    async def fetch(url):
+        calls.append(url)
+        await asyncio.sleep(60 if len(calls) == 1 else 0.01)
+        return CachedResponse(url=url, data={'a': 1}, digest='d', ttl=60)
+
+    cache._fetch = fetch
+
+    async def scenario():
+        leader = asyncio.ensure_future(cache.fetch('u'))
+        await asyncio.sleep(0)
+        waiters = [asyncio.ensure_future(cache.fetch('u')) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        entries = await asyncio.wait_for(asyncio.gather(*waiters), timeout=5)
+        assert leader.cancelled()
+        return entries
+
+    entries = asyncio.run(scenario())
+
+    assert [entry.data for entry in entries] == [{'a': 1}] * 3
+    # one of the waiters took over, the others shared its fetch
+    assert len(calls) == 2
+    assert cache._inflight == {}
+
+
+class BlockingStore(PersistentCache):
+    """Store whose reads and writes wait until ``unblocked`` is set, like a locked database."""
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.unblocked = threading.Event()
+        self.released = []
+
+    def get(self, url: str):
+        self.released.append(self.unblocked.wait(5))
+        return super().get(url)
+
+    def set(self, url: str, *args, **kwargs):
+        self.released.append(self.unblocked.wait(5))
+        return super().set(url, *args, **kwargs)
+
+
+def test_store_access_does_not_block_the_loop(stub, tmp_path):
+    stub.documents['/doc'] = ({'a': 1}, {'Cache-Control': 'max-age=60'})
+    store = BlockingStore(str(tmp_path / 'cache.db'))
+    cache = AsyncResponseCache(ResponseCache(request=None, store=store))
+
+    async def unblock():
+        # runs only if the loop is free while the store waits
+        while True:
+            await asyncio.sleep(0.01)
+            store.unblocked.set()
+
+    async def scenario():
+        unblocking = asyncio.ensure_future(unblock())
+        try:
+            return await cache.fetch(stub.url('/doc'))
+        finally:
+            unblocking.cancel()
+
+    entry = asyncio.run(scenario())
+
+    assert entry.data == {'a': 1}
+    assert store.released == [True, True]
+    assert store.get(stub.url('/doc')) is not None
+
+
+def test_asgi_validate_through_the_async_client(stub):
+    context_url = serve_context(stub, 'Async', SCHEMA, {'Cache-Control': 'max-age=60'})
+
+    valid = asyncio.run(call_asgi('/api/validate', b'{"@context": "%s", "data": {"name": 1}}' % context_url.encode()))
+    invalid = asyncio.run(call_asgi('/api/validate', b'{"@context": "%s", "data": {}}' % context_url.encode()))
+
+    assert valid == (200, b'{"isValid":"True"}\n')
+    assert invalid[0] == 422
+    assert len(stub.hits('/v2/Schema/Async')) == 1
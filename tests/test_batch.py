@@ -0,0 +1,100 @@
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from standards import app
+from standards.api import batch
+from tests.stub import serve_context
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        '@context': {'type': 'string'},
+        'data': {'type': 'object', 'properties': {'value': {'type': 'number'}}, 'required': ['name']}
+    },
+    'required': ['@context', 'data']
+}
+
+
+@pytest.fixture
+def documents(stub):
+    sensor = serve_context(stub, 'BatchSensor', SCHEMA, {'Cache-Control': 'max-age=60'})
+    device = serve_context(stub, 'BatchDevice', SCHEMA, {'Cache-Control': 'max-age=60'})
+    documents = []
+    for index in range(60):
+        context_url = sensor if index % 2 else device
+        if index % 5 == 0:
+            documents.append({'@context': context_url, 'data': {'value': index}})
+        elif index % 7 == 0:
+            documents.append({'@context': context_url, 'data': {'name': 'x', 'value': str(index)}})
+        elif index % 11 == 0:
+            documents.append({'data': {'name': 'x'}})
+        elif index % 13 == 0:
+            documents.append({'@context': stub.url('/v2/Context/Missing/'), 'data': {'name': 'x'}})
+        else:
+            documents.append({'@context': context_url, 'data': {'name': 'x', 'value': index}})
+    return documents
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setitem(app.config, 'BATCH_PROCESSES', 2)
+    monkeypatch.setitem(app.config, 'BATCH_POOL_MIN_ITEMS', 10)
+    monkeypatch.setitem(app.config, 'BATCH_CHUNK_SIZE', 7)
+    yield
+    batch.reset_pool()
+
+
+def validate_in_process(documents, monkeypatch):
+    with monkeypatch.context() as patch:
+        patch.setitem(app.config, 'BATCH_PROCESSES', 0)
+        return batch.validate_batch(documents)
+
+
+def test_pool_results_equal_in_process_results(documents, pool, monkeypatch):
+    in_process = validate_in_process(documents, monkeypatch)
+    submitted = []
+    get_pool = batch.get_pool
+    monkeypatch.setattr(batch, 'get_pool', lambda: submitted.append(1) or get_pool())
+
+    pooled = batch.validate_batch(documents)
+
+    assert len(submitted) > 1
+    assert pooled == in_process
+
+
+def test_errors_are_placed_at_their_item(documents, client, monkeypatch):
+    results = validate_in_process(documents, monkeypatch)
+
+    assert len(results) == len(documents)
+    for document, result in zip(documents, results):
+        assert result == client.post('/api/validate', json=document).get_json()
+    statuses = {result.get('error', {}).get('status') for result in results}
+    assert statuses == {None, 404, 422}
+
+
+def test_the_endpoint_answers_the_same_with_and_without_the_pool(documents, pool, client, monkeypatch):
+    pooled = client.post('/api/validate/batch', json=documents).get_json()
+    monkeypatch.setitem(app.config, 'BATCH_PROCESSES', 0)
+
+    assert client.post('/api/validate/batch', json=documents).get_json() == pooled
+
+
+class BrokenPool:
+    def submit(self, *args, **kwargs):
+        future = Future()
+        future.set_exception(BrokenProcessPool('a worker died'))
+        return future
+
+
+def test_a_broken_pool_falls_back_to_validating_in_process(documents, pool, monkeypatch):
+    in_process = validate_in_process(documents, monkeypatch)
+    resets = []
+    monkeypatch.setattr(batch, 'get_pool', BrokenPool)
+    monkeypatch.setattr(batch, 'reset_pool', lambda: resets.append(1))
+
+    results = batch.validate_batch(documents)
+
+    assert results == in_process
+    assert resets
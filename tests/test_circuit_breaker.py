@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from standards.api.client import CircuitBreaker, CircuitOpenError, UpstreamClient
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(threshold=3, recovery_timeout=60)
+
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_success()
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker(threshold=1, recovery_timeout=0)
+    breaker.record_failure()
+
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # one probe at a time
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_client_fails_fast_while_the_circuit_is_open(stub):
+    stub.documents['/down'] = ({}, {}, 500)
+    client = UpstreamClient(retries=0, breaker_threshold=2, breaker_recovery=60)
+
+    for _ in range(2):
+        assert client.request('GET', stub.url('/down')).status_code == 500
+    with pytest.raises(CircuitOpenError):
+        client.request('GET', stub.url('/down'))
+
+    assert len(stub.hits('/down')) == 2
+
+
+def test_client_recovers_after_a_successful_probe(stub):
+    stub.documents['/flaky'] = ({}, {}, 500)
+    client = UpstreamClient(retries=0, breaker_threshold=1, breaker_recovery=0.05)
+    client.request('GET', stub.url('/flaky'))
+    stub.documents['/flaky'] = {'a': 1}
+
+    time.sleep(0.05)
+    assert client.request('GET', stub.url('/flaky')).json() == {'a': 1}
+    assert client.breaker(stub.url('/flaky')).state == CircuitBreaker.CLOSED
+
+
+def test_breakers_are_kept_for_a_bounded_number_of_hosts():
+    client = UpstreamClient(breaker_hosts=2)
+    first = client.breaker('http://a.test/doc')
+
+    assert client.breaker('http://a.test/other') is first
+    for index in range(100):
+        client.breaker(f'http://host{index}.test/doc')
+
+    assert len(client._breakers) == 2
+    assert client.breaker('http://a.test/doc') is not first
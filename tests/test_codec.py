@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from standards.api import codec
+
+CONTEXT_URL = 'https://standards.oftrust.net/v2/Context/DataProductOutput/Sensor/'
+
+DOCUMENTS = [
+    {'@context': CONTEXT_URL, 'data': {'name': 'x', 'value': 1.5, 'ok': True, 'none': None, 'list': [1, -2, 0.25]}},
+    {'text': 'äö € 😀', 'escaped': '"\\/\b\f\n\r\t\x00\x1f\x7f', 'empty': {}, 'nested': [[], [{}], {'a': []}]},
+    {'b': 1, 'a': 2, 'c': {'z': 1, 'y': [3, 2, 1]}},
+    {'min': -9223372036854775808, 'max': 18446744073709551615, 'zero': 0, 'float': 0.1, 'small': 0.0001},
+    ['list', 'as', 'root', 1, 2.5, False],
+    'text',
+    12,
+    None,
+]
+
+WIDE_INTEGERS = [
+    '123456789012345678901',
+    '-9223372036854775809',
+    '18446744073709551616',
+    '{"n": 123456789012345678901, "m": [1, -100000000000000000000000]}',
+    '[1.5, 99999999999999999999]',
+]
+
+
+@pytest.fixture(params=codec.BACKENDS)
+def backend(request):
+    selected = codec.backend()
+    codec.select(request.param)
+    yield codec.backend()
+    codec.select(selected)
+
+
+@pytest.mark.parametrize('document', DOCUMENTS)
+@pytest.mark.parametrize('options', [
+    {},
+    {'separators': (',', ':')},
+    {'separators': (',', ':'), 'ensure_ascii': False},
+    {'indent': 2},
+    {'indent': 4, 'ensure_ascii': False},
+    {'indent': 4, 'sort_keys': True},
+    {'separators': (',', ':'), 'sort_keys': True},
+])
+def test_dumps_gives_the_text_of_json(backend, document, options):
+    assert codec.dumps(document, **options) == json.dumps(document, **options)
+
+
+@pytest.mark.parametrize('value', [1e16, 1e-05, 2.5e-8, 1.5e300, 1.2345678901234568e+17, 5e-324])
+def test_dumps_floats_with_an_exponent_read_back_equal(backend, value):
+    assert json.loads(codec.dumps({'f': value}, separators=(',', ':'))) == {'f': value}
+
+
+@pytest.mark.parametrize('document', DOCUMENTS)
+def test_loads_gives_the_values_of_json(backend, document):
+    text = json.dumps(document, ensure_ascii=False)
+
+    assert codec.loads(text) == json.loads(text)
+    assert codec.loads(text.encode('utf-8')) == json.loads(text)
+
+
+@pytest.mark.parametrize('text', WIDE_INTEGERS)
+def test_loads_keeps_integers_beyond_64_bits(backend, text):
+    parsed = codec.loads(text)
+
+    assert parsed == json.loads(text)
+    assert json.dumps(parsed) == json.dumps(json.loads(text))
+    assert codec.loads(text.encode('utf-8')) == parsed
+
+
+@pytest.mark.parametrize('text', ['{"a": NaN}', '[Infinity, -Infinity]'])
+def test_loads_accepts_what_json_accepts(backend, text):
+    assert json.dumps(codec.loads(text)) == json.dumps(json.loads(text))
+
+
+@pytest.mark.parametrize('text', ['{"a": ', '[1,]', '', '{"a" 1}'])
+def test_loads_rejects_what_json_rejects(backend, text):
+    with pytest.raises(ValueError):
+        codec.loads(text)
+
+
+def test_schema_of_a_wide_integer_is_integer(client):
+    body = '{"@context": "%s", "data": {"n": 123456789012345678901}}' % CONTEXT_URL
+
+    response = client.post('/api/schema', data=body, content_type='application/json')
+
+    assert response.status_code == 200
+    assert response.get_json()['properties']['data']['properties']['n']['type'] == 'integer'
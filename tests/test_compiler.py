@@ -0,0 +1,110 @@
+import pytest
+from jsonschema import Draft7Validator
+
+from standards.api.compiler import CompiledValidator, UnsupportedSchema, build_validator, compile_schema
+from tests.stub import serve_context
+
+SCHEMA = {
+    '$schema': 'http://json-schema.org/draft-07/schema',
+    'type': 'object',
+    'properties': {
+        '@context': {'type': 'string', 'const': 'https://example.com/Context/'},
+        '@type': {'type': 'string', 'enum': ['Sensor', 'Meter']},
+        'data': {
+            'type': 'object',
+            'properties': {
+                'name': {'type': 'string', 'minLength': 2},
+                'value': {'type': ['number', 'null']},
+                'count': {'type': 'integer'},
+                'flag': {'type': 'boolean', 'enum': [True]},
+                'tags': {'type': 'array'},
+                'nested': {'type': 'object', 'properties': {'id': {'type': 'string'}}, 'required': ['id']}
+            },
+            'required': ['name', 'value']
+        }
+    },
+    'required': ['@context', '@type', 'data']
+}
+
+INSTANCES = [
+    {'@context': 'https://example.com/Context/', '@type': 'Sensor', 'data': {'name': 'ab', 'value': 1.5}},
+    {'@context': 'https://example.com/Context/', '@type': 'Sensor',
+     'data': {'name': 'a', 'value': '1', 'count': 1.0, 'flag': 1, 'tags': {}, 'nested': {}}},
+    {'@context': 'https://example.com/Other/', '@type': 'Gateway', 'data': []},
+    {'@type': 'Meter', 'data': {'name': 'abc', 'value': None, 'count': 2.5, 'flag': False, 'nested': {'id': 7}}},
+    {'data': {'count': True, 'flag': 0, 'nested': []}},
+    [],
+    'text',
+    None,
+]
+
+
+def error_list(validator, instance):
+    return [
+        (error.message, error.validator, error.validator_value, list(error.path), list(error.schema_path))
+        for error in validator.iter_errors(instance)
+    ]
+
+
+def nested_schema(depth: int) -> dict:
+    schema = {'type': 'string', 'minLength': 1}
+    for level in range(depth):
+        schema = {'type': 'object', 'properties': {f'p{level}': schema}, 'required': [f'p{level}']}
+    return schema
+
+
+def nested_instance(depth: int, leaf) -> dict:
+    instance = leaf
+    for level in range(depth):
+        instance = {f'p{level}': instance}
+    return instance
+
+
+@pytest.mark.parametrize('instance', INSTANCES)
+def test_compiled_errors_equal_draft7_errors(instance):
+    compiled = compile_schema(SCHEMA)
+
+    assert error_list(compiled, instance) == error_list(Draft7Validator(SCHEMA), instance)
+    assert compiled.is_valid(instance) == Draft7Validator(SCHEMA).is_valid(instance)
+
+
+@pytest.mark.parametrize('schema', [
+    {'type': 'object', 'properties': {'a': {'$ref': '#/definitions/a'}}},
+    {'type': 'object', 'properties': {'a': {'type': 'string', 'pattern': '^x'}}},
+    {'type': 'object', 'properties': {'a': {'type': 'date'}}},
+])
+def test_unsupported_schemas_fall_back_to_draft7(schema):
+    with pytest.raises(UnsupportedSchema):
+        compile_schema(schema)
+
+    assert isinstance(build_validator(schema), Draft7Validator)
+
+
+@pytest.mark.parametrize('depth', [40, 60, 300])
+def test_deeply_nested_schemas_are_validated(depth):
+    schema = nested_schema(depth)
+    validator = build_validator(schema)
+    generic = Draft7Validator(schema)
+
+    if depth <= 40:
+        assert isinstance(validator, CompiledValidator)
+    else:
+        assert isinstance(validator, Draft7Validator)
+    for leaf in ('x', '', 1):
+        instance = nested_instance(depth, leaf)
+        assert error_list(validator, instance) == error_list(generic, instance)
+
+
+def test_validate_endpoint_accepts_deeply_nested_schemas(stub, client):
+    depth = 80
+    schema = nested_schema(depth)
+    schema['properties']['@context'] = {'type': 'string'}
+    context_url = serve_context(stub, 'Deep', schema, {'Cache-Control': 'max-age=60'})
+
+    valid = dict(nested_instance(depth, 'x'), **{'@context': context_url})
+    invalid = dict(nested_instance(depth, ''), **{'@context': context_url})
+
+    assert client.post('/api/validate', json=valid).status_code == 200
+    response = client.post('/api/validate', json=invalid)
+    assert response.status_code == 422
+    assert response.get_json()['error']['fields']
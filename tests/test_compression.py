@@ -0,0 +1,174 @@
+import gzip
+import io
+import json
+import zlib
+
+import pytest
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+
+from standards import app
+from standards.api.compression import decompressing_stream, negotiate_encoding
+from standards.errors import BadRequestSyntaxException, PayloadTooLargeException, UnsupportedMediaTypeException
+from tests.stub import serve_context
+
+BODY = json.dumps({'data': [{'name': f'sensor {index}', 'value': index} for index in range(500)]}).encode()
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {'@context': {'type': 'string'}, 'data': {'type': 'object', 'required': ['name']}},
+    'required': ['@context', 'data']
+}
+
+
+def raw_deflate(data: bytes) -> bytes:
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def decoded(body: bytes, content_encoding: str, max_bytes=len(BODY)) -> bytes:
+    return decompressing_stream(io.BytesIO(body), content_encoding, max_bytes).read()
+
+
+@pytest.mark.parametrize('content_encoding, body', [
+    ('gzip', gzip.compress(BODY)),
+    ('GZIP', gzip.compress(BODY)),
+    ('deflate', zlib.compress(BODY)),
+    ('deflate', raw_deflate(BODY)),
+    ('identity', BODY),
+    ('deflate, gzip', gzip.compress(zlib.compress(BODY))),
+    ('gzip, identity, deflate', zlib.compress(gzip.compress(BODY))),
+])
+def test_bodies_are_decoded(content_encoding, body):
+    assert decoded(body, content_encoding) == BODY
+
+
+@pytest.mark.parametrize('wbits', [9, 12, 15])
+def test_zlib_and_raw_deflate_are_told_apart_for_every_window(wbits):
+    zlib_compressor = zlib.compressobj(wbits=wbits)
+    raw_compressor = zlib.compressobj(wbits=-wbits)
+
+    assert decoded(zlib_compressor.compress(BODY) + zlib_compressor.flush(), 'deflate') == BODY
+    assert decoded(raw_compressor.compress(BODY) + raw_compressor.flush(), 'deflate') == BODY
+
+
+def test_the_stream_is_read_in_chunks():
+    stream = decompressing_stream(io.BytesIO(gzip.compress(BODY)), 'gzip', len(BODY))
+
+    chunks = iter(lambda: stream.read(100), b'')
+
+    assert b''.join(chunks) == BODY
+
+
+def test_a_body_larger_than_the_limit_is_rejected():
+    with pytest.raises(PayloadTooLargeException):
+        decoded(gzip.compress(BODY), 'gzip', max_bytes=len(BODY) - 1)
+
+
+@pytest.mark.parametrize('content_encoding, body', [
+    ('gzip', b'not gzip at all'),
+    ('gzip', gzip.compress(BODY)[:-20]),
+    ('deflate', zlib.compress(BODY)[:50]),
+    ('gzip', b''),
+])
+def test_corrupt_or_truncated_data_is_rejected(content_encoding, body):
+    with pytest.raises(BadRequestSyntaxException):
+        decoded(body, content_encoding)
+
+
+@pytest.mark.parametrize('content_encoding', ['br', 'gzip, br', 'compress'])
+def test_other_encodings_are_unsupported(content_encoding):
+    with pytest.raises(UnsupportedMediaTypeException):
+        decompressing_stream(io.BytesIO(BODY), content_encoding, len(BODY))
+
+
+@pytest.mark.parametrize('header, encoding', [
+    ('gzip', 'gzip'),
+    ('deflate', 'deflate'),
+    ('gzip, deflate', 'gzip'),
+    ('deflate, gzip', 'gzip'),
+    ('gzip;q=0.5, deflate', 'deflate'),
+    ('gzip;q=0, deflate;q=0', None),
+    ('br', None),
+    ('*', 'gzip'),
+    (None, None),
+])
+def test_response_encoding_is_negotiated(header, encoding):
+    assert negotiate_encoding(parse_accept_header(header, Accept)) == encoding
+
+
+@pytest.fixture
+def context_url(stub):
+    return serve_context(stub, 'Compressed', SCHEMA, {'Cache-Control': 'max-age=60'})
+
+
+def post_validate(client, body: bytes, content_encoding: str, **headers):
+    return client.post('/api/validate', data=body, content_type='application/json',
+                       headers=dict(headers, **{'Content-Encoding': content_encoding}))
+
+
+@pytest.mark.parametrize('encode, content_encoding', [
+    (gzip.compress, 'gzip'),
+    (zlib.compress, 'deflate'),
+    (raw_deflate, 'deflate'),
+])
+def test_validate_accepts_compressed_bodies(client, context_url, encode, content_encoding):
+    body = json.dumps({'@context': context_url, 'data': {'name': 'x'}}).encode()
+
+    response = post_validate(client, encode(body), content_encoding)
+
+    assert response.status_code == 200
+    assert response.get_json() == {'isValid': 'True'}
+
+
+def test_validate_rejects_corrupt_bodies_with_400(client, context_url):
+    response = post_validate(client, b'\x1f\x8b not really gzip', 'gzip')
+
+    assert response.status_code == 400
+
+
+def test_validate_rejects_bodies_over_the_limit_with_413(client, context_url, monkeypatch):
+    monkeypatch.setitem(app.config, 'MAX_DECOMPRESSED_BYTES', 100)
+    body = json.dumps({'@context': context_url, 'data': {'name': 'x' * 1000}}).encode()
+
+    response = post_validate(client, gzip.compress(body), 'gzip')
+
+    assert response.status_code == 413
+
+
+def test_validate_rejects_brotli_with_415(client, context_url):
+    response = post_validate(client, b'...', 'br')
+
+    assert response.status_code == 415
+
+
+def test_large_responses_are_compressed_as_negotiated(client, context_url, monkeypatch):
+    monkeypatch.setitem(app.config, 'COMPRESS_MIN_BYTES', 10)
+    document = {'@context': context_url, 'data': {}}
+
+    plain = client.post('/api/validate', json=document)
+    gzipped = client.post('/api/validate', json=document, headers={'Accept-Encoding': 'gzip'})
+    deflated = client.post('/api/validate', json=document, headers={'Accept-Encoding': 'gzip;q=0.1, deflate'})
+
+    assert plain.status_code == gzipped.status_code == deflated.status_code == 422
+    assert 'Content-Encoding' not in plain.headers
+    assert gzipped.headers['Content-Encoding'] == 'gzip'
+    assert deflated.headers['Content-Encoding'] == 'deflate'
+    assert gzip.decompress(gzipped.get_data()) == plain.get_data()
+    assert zlib.decompress(deflated.get_data()) == plain.get_data()
+    assert 'Accept-Encoding' in gzipped.headers['Vary']
+
+
+def test_small_and_streamed_responses_are_not_compressed(client, context_url):
+    small = client.post('/api/validate', json={'@context': context_url, 'data': {'name': 'x'}},
+                        headers={'Accept-Encoding': 'gzip'})
+    lines = (json.dumps({'@context': context_url, 'data': {}}) + '\n') * 100
+    streamed = client.post('/api/validate/ndjson', data=lines, content_type='application/x-ndjson',
+                           headers={'Accept-Encoding': 'gzip'})
+    streamed_data = streamed.get_data()
+
+    assert small.status_code == 200
+    assert 'Content-Encoding' not in small.headers
+    assert 'Accept-Encoding' in small.headers['Vary']
+    assert 'Content-Encoding' not in streamed.headers
+    assert len(streamed_data.splitlines()) == 100
@@ -0,0 +1,233 @@
+import copy
+import random
+
+import pytest
+from jsonschema import Draft7Validator
+
+from standards.api.delta import DeltaStore, delta_supported, fingerprint_tree
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        '@id': {'type': 'string'},
+        'data': {
+            'type': 'object',
+            'properties': {
+                'name': {'type': 'string', 'minLength': 1},
+                'tags': {'type': 'array', 'uniqueItems': True, 'maxItems': 6, 'items': {'type': 'string'}},
+                'readings': {
+                    'type': 'array',
+                    'minItems': 1,
+                    'items': {
+                        'type': 'object',
+                        'properties': {
+                            'value': {'type': 'number', 'maximum': 100},
+                            'unit': {'type': 'string', 'enum': ['C', 'F']}
+                        },
+                        'required': ['value', 'unit']
+                    }
+                },
+                'location': {
+                    'type': 'object',
+                    'properties': {'lat': {'type': 'number'}, 'lon': {'type': 'number'}},
+                    'required': ['lat', 'lon']
+                }
+            },
+            'required': ['name', 'readings']
+        }
+    },
+    'required': ['@id', 'data']
+}
+
+BASE = {
+    '@id': 'https://example.com/sensor/1',
+    'data': {
+        'name': 'sensor',
+        'tags': ['a', 'b', 'c'],
+        'readings': [{'value': 1, 'unit': 'C'}, {'value': 2.5, 'unit': 'F'}, {'value': 3, 'unit': 'C'}],
+        'location': {'lat': 60.1, 'lon': 24.9}
+    }
+}
+
+
+def errors(found):
+    return [
+        (error.message, error.validator, list(error.path), list(error.schema_path), error.instance)
+        for error in found
+    ]
+
+
+@pytest.fixture
+def store():
+    return DeltaStore()
+
+
+@pytest.fixture
+def validator():
+    return Draft7Validator(SCHEMA)
+
+
+def assert_delta_equals_full(store, validator, document, digest='schema'):
+    """Validate document after BASE, checking both that the delta path was taken and
+    that it found what full validation finds."""
+    delta_validations = store.delta_validations
+    assert errors(store.iter_errors(digest, validator, copy.deepcopy(BASE))) == []
+
+    found = errors(store.iter_errors(digest, validator, document))
+
+    assert store.delta_validations == delta_validations + 1
+    assert found == errors(validator.iter_errors(document))
+    return found
+
+
+def mutated(change):
+    document = copy.deepcopy(BASE)
+    change(document['data'])
+    return document
+
+
+MUTATIONS = {
+    'replace an item': lambda data: data['readings'].__setitem__(1, {'value': 'x', 'unit': 'K'}),
+    'replace a valid item': lambda data: data['readings'].__setitem__(1, {'value': 7, 'unit': 'C'}),
+    'append an item': lambda data: data['readings'].append({'value': 101}),
+    'append a valid item': lambda data: data['readings'].append({'value': 4, 'unit': 'C'}),
+    'pop an item': lambda data: data['readings'].pop(0),
+    'pop every item': lambda data: data['readings'].clear(),
+    'reorder items': lambda data: data['readings'].reverse(),
+    'duplicate a tag': lambda data: data['tags'].__setitem__(2, 'a'),
+    'append a duplicate tag': lambda data: data['tags'].append('b'),
+    'too many tags': lambda data: data['tags'].extend(['d', 'e', 'f', 'g']),
+    'drop a required key of a nested object': lambda data: data['location'].pop('lat'),
+    'drop a required key of an item': lambda data: data['readings'][2].pop('unit'),
+    'drop a required key of data': lambda data: data.pop('name'),
+    'change a type at a parent': lambda data: data.__setitem__('location', [60.1, 24.9]),
+    'change a scalar': lambda data: data.__setitem__('name', ''),
+    'add an unknown key': lambda data: data.__setitem__('extra', {'a': 1}),
+}
+
+
+@pytest.mark.parametrize('change', MUTATIONS.values(), ids=MUTATIONS.keys())
+def test_delta_errors_equal_full_validation(store, validator, change):
+    assert_delta_equals_full(store, validator, mutated(change))
+
+
+def test_changes_are_found_at_the_changed_parent(store, validator):
+    found = assert_delta_equals_full(store, validator, mutated(MUTATIONS['duplicate a tag']))
+
+    assert [(validator_keyword, path) for _, validator_keyword, path, *_ in found] == [('uniqueItems', ['data', 'tags'])]
+
+
+def random_mutation(rng, data):
+    readings, tags = data['readings'], data['tags']
+    choice = rng.randrange(8)
+    if choice == 0 and readings:
+        readings[rng.randrange(len(readings))] = {'value': rng.choice([1, 200, 'x']), 'unit': rng.choice(['C', 'K'])}
+    elif choice == 1:
+        readings.append({'value': rng.choice([5, 101])} if rng.random() < 0.5 else {'value': 5, 'unit': 'C'})
+    elif choice == 2 and readings:
+        readings.pop(rng.randrange(len(readings)))
+    elif choice == 3:
+        rng.shuffle(readings)
+    elif choice == 4:
+        tags.append(rng.choice(['a', 'b', 'z', 1]))
+    elif choice == 5 and tags:
+        tags.pop(rng.randrange(len(tags)))
+    elif choice == 6 and isinstance(data['location'], dict):
+        data['location'].pop(rng.choice(['lat', 'lon']), None)
+    else:
+        data[rng.choice(['name', 'location', 'extra'])] = rng.choice(['', 'x', 1, None, {}])
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_random_mutations_equal_full_validation(store, validator, seed):
+    rng = random.Random(seed)
+    document = copy.deepcopy(BASE)
+    for _ in range(rng.randint(1, 4)):
+        random_mutation(rng, document['data'])
+
+    assert_delta_equals_full(store, validator, document)
+
+
+def test_a_chain_of_valid_versions_is_compared_to_the_last(store, validator):
+    versions = [mutated(MUTATIONS['append a valid item']), mutated(MUTATIONS['reorder items'])]
+    assert errors(store.iter_errors('schema', validator, copy.deepcopy(BASE))) == []
+
+    for version in versions:
+        assert errors(store.iter_errors('schema', validator, version)) == []
+    invalid = mutated(MUTATIONS['replace an item'])
+
+    assert errors(store.iter_errors('schema', validator, invalid)) == errors(validator.iter_errors(invalid))
+    assert store.delta_validations == 3
+
+
+def test_invalid_versions_are_not_remembered(store, validator):
+    invalid = mutated(MUTATIONS['replace an item'])
+    list(store.iter_errors('schema', validator, copy.deepcopy(BASE)))
+    list(store.iter_errors('schema', validator, invalid))
+
+    # still compared to BASE, the error is found again
+    assert errors(store.iter_errors('schema', validator, invalid)) == errors(validator.iter_errors(invalid))
+    assert store.delta_validations == 2
+
+
+def test_a_changed_schema_validates_fully(store, validator):
+    list(store.iter_errors('old-schema', validator, copy.deepcopy(BASE)))
+    document = mutated(MUTATIONS['replace an item'])
+
+    found = errors(store.iter_errors('new-schema', validator, document))
+
+    assert store.delta_validations == 0
+    assert found == errors(validator.iter_errors(document))
+
+
+def test_documents_without_an_id_validate_fully(store, validator):
+    document = mutated(MUTATIONS['replace an item'])
+    del document['@id']
+
+    list(store.iter_errors('schema', validator, document))
+    found = errors(store.iter_errors('schema', validator, document))
+
+    assert store.delta_validations == 0
+    assert found == errors(validator.iter_errors(document))
+    assert store.stats()['size'] == 0
+
+
+@pytest.mark.parametrize('keyword, value', [
+    ('anyOf', [{'type': 'string'}, {'type': 'number'}]),
+    ('additionalProperties', False),
+    ('patternProperties', {'^x': {'type': 'string'}}),
+    ('dependencies', {'lat': ['lon']}),
+    ('if', {'required': ['lat']}),
+])
+def test_composite_keywords_validate_fully(store, keyword, value):
+    schema = copy.deepcopy(SCHEMA)
+    schema['properties']['data']['properties']['location'][keyword] = value
+    validator = Draft7Validator(schema)
+    list(store.iter_errors('schema', validator, copy.deepcopy(BASE)))
+    document = mutated(lambda data: data['location'].update({'lat': 'x', 'xy': 1}))
+
+    found = errors(store.iter_errors('schema', validator, document))
+
+    assert store.delta_validations == 0
+    assert found == errors(validator.iter_errors(document))
+
+
+@pytest.mark.parametrize('schema, supported', [
+    (SCHEMA, True),
+    ({'type': 'object', 'properties': {'a': {'$ref': '#/definitions/a'}}}, False),
+    ({'type': 'array', 'items': [{'type': 'string'}]}, False),
+    ({'type': 'array', 'items': {'oneOf': [{'type': 'string'}]}}, False),
+    ({'properties': {'a': {'properties': {'b': {'not': {}}}}}}, False),
+    ({'properties': {'a': True}}, False),
+    ({}, True),
+])
+def test_delta_supported(schema, supported):
+    assert delta_supported(schema) is supported
+
+
+def test_fingerprints_ignore_key_order_but_not_types():
+    assert fingerprint_tree({'a': 1, 'b': [1, 2]})[0][0] == fingerprint_tree({'b': [1, 2], 'a': 1})[0][0]
+    assert fingerprint_tree([1, 2])[0][0] != fingerprint_tree([2, 1])[0][0]
+    assert fingerprint_tree({'a': 1})[0][0] != fingerprint_tree({'a': 1.0})[0][0]
+    assert fingerprint_tree({'a': 1})[0][0] != fingerprint_tree({'a': True})[0][0]
+    assert fingerprint_tree({'a': [1, {'b': None}]})[1] == 5
@@ -0,0 +1,162 @@
+import threading
+
+import pytest
+
+from standards.api import cache as cache_module
+from standards.api.cache import LRUCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert len(cache) == 2
+
+
+def test_entries_beyond_the_byte_budget_are_evicted():
+    cache = LRUCache(maxsize=10, max_bytes=100)
+    cache.set('a', 1, size=40)
+    cache.set('b', 2, size=40)
+
+    cache.set('c', 3, size=40)
+
+    assert cache.peek('a') is None
+    assert cache.bytes == 80
+    assert cache.stats()['bytes'] == 80
+
+
+def test_an_entry_larger_than_the_budget_is_not_kept():
+    cache = LRUCache(maxsize=10, max_bytes=100)
+    cache.set('a', 1, size=40)
+
+    cache.set('b', 2, size=101)
+
+    assert cache.peek('b') is None
+    assert cache.peek('a') == 1
+
+
+def test_replacing_an_entry_releases_its_size():
+    cache = LRUCache(maxsize=10, max_bytes=100)
+    cache.set('a', 1, size=60)
+    cache.set('a', 2, size=30)
+    cache.pop('a')
+
+    assert cache.bytes == 0
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = LRUCache(maxsize=10, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2, ttl=120)
+
+    clock[0] += 60
+
+    assert cache.get('a') is None
+    assert cache.get('b') == 2
+    assert len(cache) == 1
+
+
+def test_counters_count_hits_and_misses(clock):
+    cache = LRUCache(maxsize=10, ttl=60)
+    cache.set('a', 1)
+    cache.get('a')
+    cache.get('a')
+    cache.get('b')
+    clock[0] += 60
+    cache.get('a')
+
+    assert cache.stats() == {'size': 0, 'maxsize': 10, 'hits': 2, 'misses': 2, 'hit_rate': 0.5}
+
+    cache.clear()
+    assert cache.stats()['hits'] == cache.stats()['misses'] == 0
+
+
+def test_get_or_set_builds_on_a_miss_only():
+    cache = LRUCache(maxsize=10)
+    calls = []
+
+    first = cache.get_or_set('a', lambda: calls.append(1) or object())
+    second = cache.get_or_set('a', lambda: calls.append(1) or object())
+
+    assert first is second
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_a_failed_build_is_not_cached():
+    cache = LRUCache(maxsize=10)
+
+    def fail():
+        raise ValueError('bad schema')
+
+    with pytest.raises(ValueError):
+        cache.get_or_set('a', fail)
+
+    assert cache.get_or_set('a', lambda: 1) == 1
+
+
+def test_lookups_go_on_while_a_value_is_built():
+    cache = LRUCache(maxsize=10)
+    cache.set('other', 1)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_build():
+        started.set()
+        release.wait(5)
+        return 2
+
+    builder = threading.Thread(target=lambda: cache.get_or_set('slow', slow_build))
+    builder.start()
+    started.wait(5)
+    results = []
+    reader = threading.Thread(target=lambda: results.append(
+        (cache.get('other'), cache.get_or_set('another', lambda: 3))))
+    reader.start()
+    reader.join(5)
+    finished = not reader.is_alive()
+    release.set()
+    builder.join(5)
+
+    assert finished
+    assert results == [(1, 3)]
+    assert cache.get('slow') == 2
+
+
+def test_concurrent_misses_share_one_build():
+    cache = LRUCache(maxsize=10)
+    calls = []
+    started, release = threading.Event(), threading.Event()
+
+    def build():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_set('a', build))) for _ in range(5)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert len(results) == 5
+    assert all(result is results[0] for result in results)
@@ -0,0 +1,30 @@
+import json
+
+from tests.stub import serve_context
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {'@context': {'type': 'string'}, 'data': {'type': 'object', 'required': ['name']}},
+    'required': ['@context', 'data']
+}
+
+
+def test_ndjson_results_are_compact_like_the_other_endpoints(stub, client):
+    context_url = serve_context(stub, 'Lines', SCHEMA, {'Cache-Control': 'max-age=60'})
+    documents = [
+        {'@context': context_url, 'data': {'name': 'ä'}},
+        {'@context': context_url, 'data': {}},
+    ]
+    body = '\n'.join(json.dumps(document) for document in documents) + '\nnot json\n'
+
+    response = client.post('/api/validate/ndjson', data=body, content_type='application/x-ndjson')
+    lines = response.get_data(as_text=True).splitlines()
+
+    assert response.status_code == 200
+    assert len(lines) == 3
+    for line in lines:
+        # the layout jsonify gives the same result
+        assert line == json.dumps(json.loads(line), separators=(',', ':'))
+    assert json.loads(lines[0]) == {'isValid': 'True'}
+    assert json.loads(lines[1])['error']['status'] == 422
+    assert client.post('/api/validate', json=documents[1]).get_data(as_text=True) == lines[1] + '\n'
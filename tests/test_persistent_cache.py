@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from standards.api.cache import ResponseCache
+from standards.api.store import PersistentCache
+from standards.api.utils import make_request
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PersistentCache(str(tmp_path / 'responses.sqlite3'), max_bytes=1024)
+
+
+def worker(store):
+    return ResponseCache(request=make_request, maxsize=16, store=store)
+
+
+def test_set_get_touch_delete(store):
+    store.set('u', b'{"a": 1}', etag='"v1"', last_modified=None, ttl=60)
+
+    stored = store.get('u')
+    assert (stored.body, stored.etag, stored.ttl) == (b'{"a": 1}', '"v1"', 60)
+
+    store.touch('u', 120)
+    assert store.get('u').ttl == 120
+
+    store.delete('u')
+    assert store.get('u') is None
+
+
+def test_least_recently_used_bodies_are_evicted(store):
+    store.set('a', b'a' * 400, ttl=60)
+    store.set('b', b'b' * 400, ttl=60)
+    store.get('a')
+    store.set('c', b'c' * 400, ttl=60)
+
+    assert store.get('b') is None
+    assert store.get('a') is not None
+    assert store.get('c') is not None
+
+
+def test_body_larger_than_the_store_is_skipped(store):
+    store.set('big', b'x' * 2048, ttl=60)
+
+    assert store.get('big') is None
+
+
+def test_workers_share_fetched_documents(stub, store):
+    stub.documents['/doc'] = ({'a': 1}, {'Cache-Control': 'max-age=60'})
+
+    first = worker(store).fetch(stub.url('/doc'))
+    second = worker(store).fetch(stub.url('/doc'))
+
+    assert second.data == first.data == {'a': 1}
+    assert second.digest == first.digest
+    assert len(stub.hits('/doc')) == 1
+
+
+def test_stale_stored_document_is_revalidated(stub, store):
+    stub.documents['/doc'] = ({'a': 1}, {'Cache-Control': 'max-age=0', 'ETag': '"v1"'})
+    worker(store).fetch(stub.url('/doc'))
+
+    other = worker(store)
+    entry = other.fetch(stub.url('/doc'))
+
+    assert entry.data == {'a': 1}
+    assert stub.hits('/doc')[1]['If-None-Match'] == '"v1"'
+    assert other.revalidations == 1
+
+
+def test_corrupt_stored_body_is_dropped(stub, store):
+    stub.documents['/doc'] = ({'a': 1}, {'Cache-Control': 'max-age=60'})
+    store.set(stub.url('/doc'), b'{"a": ', ttl=60)
+
+    entry = worker(store).fetch(stub.url('/doc'))
+
+    assert entry.data == {'a': 1}
+    assert json.loads(store.get(stub.url('/doc')).body) == {'a': 1}
@@ -0,0 +1,130 @@
+import pytest
+from owlready2 import AnnotationProperty, DataProperty, Thing, destroy_entity, get_ontology, locstr
+
+from standards import app
+from standards.api import registry
+from standards.api.genson.models.extentions import NAMESPACE
+from standards.api.genson.schema.strategies import object as object_strategy
+from standards.api.registry import build_registry, load_registry, url_variants
+from standards.api.utils import response_cache
+
+BASE_URL = 'https://registry.test/v2/'
+
+
+@pytest.fixture
+def onto():
+    onto = get_ontology('http://registry.test/onto.owl')
+    with onto.get_namespace(NAMESPACE):
+        class example(AnnotationProperty):
+            pass
+
+        class Sensor(Thing):
+            pass
+
+        class Temperature(Sensor):
+            pass
+
+        class data(DataProperty):
+            domain = [Sensor]
+
+        class name(DataProperty):
+            domain = [Sensor]
+            range = [str]
+
+    name.nest = [data]
+    name.label = [locstr('Name', 'en-us')]
+    name.comment = [locstr('Name of the sensor.', 'en-us')]
+    yield onto
+    onto.destroy()
+
+
+@pytest.fixture
+def registry_mode(onto, monkeypatch):
+    monkeypatch.setitem(app.config, 'REGISTRY_MODE', True)
+    monkeypatch.setitem(app.config, 'REGISTRY_BASE_URL', BASE_URL)
+    monkeypatch.setattr(registry, 'ONTO', onto)
+    yield onto
+    response_cache.replace_preloaded({}, previous=registry._registry_urls)
+    registry._registry_urls = frozenset()
+
+
+def test_url_variants_have_and_lack_the_trailing_slash():
+    assert url_variants('https://a.test/Context/Sensor/') == ('https://a.test/Context/Sensor', 'https://a.test/Context/Sensor/')
+    assert url_variants('https://a.test/Schema/Sensor') == ('https://a.test/Schema/Sensor', 'https://a.test/Schema/Sensor/')
+
+
+def test_build_registry_generates_a_context_and_schema_per_class(onto):
+    documents = build_registry(onto, BASE_URL)
+
+    assert sorted(documents) == [
+        f'{BASE_URL}Context/Sensor/',
+        f'{BASE_URL}Context/Sensor/Temperature/',
+        f'{BASE_URL}Schema/Sensor',
+        f'{BASE_URL}Schema/Sensor/Temperature',
+    ]
+    context = documents[f'{BASE_URL}Context/Sensor/Temperature/']['@context']
+    assert context['@schema'] == f'{BASE_URL}Schema/Sensor/Temperature'
+    assert context['name'] == {'@id': 'pot:name', '@nest': 'data'}
+    schema = documents[f'{BASE_URL}Schema/Sensor/Temperature']
+    assert schema['properties']['@context']['const'] == f'{BASE_URL}Context/Sensor/Temperature/'
+    assert schema['properties']['data']['properties']['name']['type'] == 'string'
+
+
+def test_load_registry_is_off_without_registry_mode(onto, monkeypatch):
+    monkeypatch.setitem(app.config, 'REGISTRY_MODE', False)
+    monkeypatch.setattr(registry, 'ONTO', onto)
+
+    assert load_registry() == 0
+    assert not [url for url in response_cache.pinned() if url.startswith(BASE_URL)]
+
+
+def test_load_registry_pins_every_url_variant(registry_mode, client):
+    assert load_registry() == 4
+
+    pinned = {url for url in response_cache.pinned() if url.startswith(BASE_URL)}
+    assert len(pinned) == 8
+    assert f'{BASE_URL}Schema/Sensor/' in pinned
+    context_url = f'{BASE_URL}Context/Sensor/'
+    valid = client.post('/api/validate', json={'@context': context_url, '@type': 'Sensor', 'data': {'name': 'a'}})
+    invalid = client.post('/api/validate', json={'@context': context_url, '@type': 'Sensor', 'data': {'name': 1}})
+    assert valid.status_code == 200
+    assert invalid.status_code == 422
+
+
+def test_reloading_unpins_the_documents_of_removed_classes(registry_mode):
+    load_registry()
+    destroy_entity(registry_mode.get_namespace(NAMESPACE).Temperature)
+
+    assert load_registry() == 2
+
+    pinned = {url for url in response_cache.pinned() if url.startswith(BASE_URL)}
+    assert pinned == {
+        f'{BASE_URL}Context/Sensor', f'{BASE_URL}Context/Sensor/',
+        f'{BASE_URL}Schema/Sensor', f'{BASE_URL}Schema/Sensor/',
+    }
+    assert registry._registry_urls == pinned
+
+
+def test_replace_preloaded_keeps_other_pins():
+    response_cache.preload('https://other.test/doc', {'a': 1})
+    response_cache.replace_preloaded({'https://registry.test/new': {'b': 1}}, previous={'https://registry.test/old'})
+    response_cache.replace_preloaded({}, previous={'https://registry.test/new'})
+
+    assert response_cache.lookup('https://other.test/doc').data == {'a': 1}
+    assert 'https://registry.test/new' not in response_cache.pinned()
+    response_cache.replace_preloaded({}, previous={'https://other.test/doc'})
+
+
+def test_property_annotations_are_read_once_per_load(onto, monkeypatch):
+    monkeypatch.setattr(object_strategy, 'ONTO', onto)
+    properties = object_strategy.ONTO_PROPERTIES
+    try:
+        object_strategy.load_onto_properties()
+        loaded = object_strategy.ONTO_PROPERTIES
+
+        assert loaded is not properties
+        assert loaded['name'] == ('Name', 'Name of the sensor.')
+        assert object_strategy.Object.annotation('name') == ('Name', 'Name of the sensor.')
+        assert object_strategy.Object.annotation('@type') == ('Identity type', 'Type of identity.')
+    finally:
+        object_strategy.ONTO_PROPERTIES = properties
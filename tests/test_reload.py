@@ -0,0 +1,43 @@
+import threading
+import time
+
+from standards.api import warmup
+from standards.api.genson.schema.strategies.object import onto_generation
+from standards.api.registry import reload_ontology
+from standards.api.utils import schema_cache
+
+
+def test_reload_ontology_drops_the_generated_schemas():
+    schema_cache.set(('context', 'shape', onto_generation()), {'type': 'object'})
+    generation = onto_generation()
+
+    reload_ontology()
+
+    assert onto_generation() == generation + 1
+    assert len(schema_cache) == 0
+
+
+def test_refresher_reloads_the_ontology_periodically(monkeypatch):
+    reloaded = threading.Event()
+    monkeypatch.setattr(warmup, 'reload_ontology', reloaded.set)
+    refresher = warmup.Refresher([], interval=0.01, reload_interval=0.02)
+
+    refresher.start()
+    try:
+        assert reloaded.wait(5)
+    finally:
+        refresher.stop()
+        refresher.join(5)
+
+
+def test_refresher_without_reload_interval_keeps_the_ontology(monkeypatch):
+    calls = []
+    monkeypatch.setattr(warmup, 'reload_ontology', lambda: calls.append(1))
+    refresher = warmup.Refresher([], interval=0.01)
+
+    refresher.start()
+    time.sleep(0.1)
+    refresher.stop()
+    refresher.join(5)
+
+    assert calls == []
@@ -0,0 +1,129 @@
+import pytest
+
+from standards.api.cache import ResponseCache
+from standards.api.utils import make_request
+from standards.errors import BadRequestException
+from tests.stub import serve_context
+
+SCHEMA = {
+    '$schema': 'http://json-schema.org/draft-07/schema',
+    'type': 'object',
+    'properties': {
+        '@context': {'type': 'string'},
+        'data': {'type': 'object', 'properties': {'name': {'type': 'string', 'minLength': 1}}, 'required': ['name']}
+    },
+    'required': ['@context', 'data']
+}
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(request=make_request, maxsize=16, default_ttl=60, negative_ttl=30)
+
+
+def test_fresh_entry_is_served_from_memory(stub, cache):
+    stub.documents['/doc'] = ({'a': 1}, {'Cache-Control': 'max-age=60'})
+
+    first = cache.fetch(stub.url('/doc'))
+    second = cache.fetch(stub.url('/doc'))
+
+    assert second is first
+    assert first.data == {'a': 1}
+    assert len(stub.hits('/doc')) == 1
+    assert cache.stats()['hits'] == 1
+
+
+def test_stale_entry_is_revalidated_with_etag(stub, cache):
+    stub.documents['/doc'] = ({'a': 1}, {'Cache-Control': 'max-age=0', 'ETag': '"v1"'})
+
+    first = cache.fetch(stub.url('/doc'))
+    second = cache.fetch(stub.url('/doc'))
+
+    hits = stub.hits('/doc')
+    assert len(hits) == 2
+    assert 'If-None-Match' not in hits[0]
+    assert hits[1]['If-None-Match'] == '"v1"'
+    # the 304 reuses the parsed body
+    assert second is first
+    assert cache.revalidations == 1
+
+
+def test_stale_entry_is_revalidated_with_last_modified(stub, cache):
+    last_modified = 'Wed, 21 Oct 2015 07:28:00 GMT'
+    stub.documents['/doc'] = ({'a': 1}, {'Cache-Control': 'no-cache', 'Last-Modified': last_modified})
+
+    cache.fetch(stub.url('/doc'))
+    cache.fetch(stub.url('/doc'))
+
+    assert stub.hits('/doc')[1]['If-Modified-Since'] == last_modified
+    assert cache.revalidations == 1
+
+
+def test_changed_document_replaces_the_entry(stub, cache):
+    stub.documents['/doc'] = ({'a': 1}, {'Cache-Control': 'max-age=0', 'ETag': '"v1"'})
+    first = cache.fetch(stub.url('/doc'))
+    stub.documents['/doc'] = ({'a': 2}, {'Cache-Control': 'max-age=0', 'ETag': '"v2"'})
+
+    second = cache.fetch(stub.url('/doc'))
+
+    assert second.data == {'a': 2}
+    assert second.digest != first.digest
+    assert cache.revalidations == 0
+
+
+def test_no_store_is_not_cached(stub, cache):
+    stub.documents['/doc'] = ({'a': 1}, {'Cache-Control': 'no-store'})
+
+    cache.fetch(stub.url('/doc'))
+    cache.fetch(stub.url('/doc'))
+
+    assert len(stub.hits('/doc')) == 2
+
+
+def test_not_found_is_raised_and_remembered(stub, cache):
+    with pytest.raises(BadRequestException):
+        cache.fetch(stub.url('/missing'))
+    with pytest.raises(BadRequestException):
+        cache.fetch(stub.url('/missing'))
+
+    assert len(stub.hits('/missing')) == 1
+    assert cache.stats()['negative'] == 1
+
+
+def test_invalid_json_is_raised_and_remembered(stub, cache):
+    stub.documents['/broken'] = (b'{"a": ', {})
+
+    with pytest.raises(ValueError):
+        cache.fetch(stub.url('/broken'))
+    with pytest.raises(ValueError):
+        cache.fetch(stub.url('/broken'))
+
+    assert len(stub.hits('/broken')) == 1
+
+
+def test_validate_reports_an_unknown_context(stub, client):
+    response = client.post('/api/validate', json={'@context': stub.url('/v2/Context/Missing/'), 'data': {}})
+
+    assert response.status_code == 404
+    assert response.get_json()['error']['error'] == 'BAD_REQUEST_EXCEPTION'
+
+
+def test_validate_reports_a_context_that_is_not_json(stub, client):
+    stub.documents['/v2/Context/Broken/'] = (b'<html></html>', {'Content-Type': 'text/html'})
+
+    response = client.post('/api/validate', json={'@context': stub.url('/v2/Context/Broken/'), 'data': {}})
+
+    assert response.status_code == 422
+
+
+def test_validate_uses_the_cached_context_and_schema(stub, client):
+    context_url = serve_context(stub, 'Cached', SCHEMA, {'Cache-Control': 'max-age=60'})
+
+    valid = client.post('/api/validate', json={'@context': context_url, 'data': {'name': 'x'}})
+    invalid = client.post('/api/validate', json={'@context': context_url, 'data': {'name': ''}})
+
+    assert valid.status_code == 200
+    assert valid.get_json() == {'isValid': 'True'}
+    assert invalid.status_code == 422
+    assert len(stub.hits('/v2/Context/Cached/')) == 1
+    assert len(stub.hits('/v2/Schema/Cached')) == 1
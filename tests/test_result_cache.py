@@ -0,0 +1,110 @@
+import pytest
+
+from standards.api import utils
+from standards.api.cache import LRUCache
+from tests.stub import serve_context
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        '@context': {'type': 'string'},
+        'data': {
+            'type': 'object',
+            'properties': {'name': {'type': 'string'}, 'value': {'type': 'number'}},
+            'required': ['name']
+        }
+    },
+    'required': ['@context', 'data']
+}
+
+
+@pytest.fixture
+def context_url(stub):
+    return serve_context(stub, 'Memoized', SCHEMA, {'Cache-Control': 'max-age=60'})
+
+
+@pytest.fixture
+def validations(monkeypatch):
+    """Count the documents actually validated, a cached result skips the validator."""
+    calls = []
+    document_errors = utils.document_errors
+
+    def counted(digest, validator, data, terms=None):
+        calls.append(data)
+        return document_errors(digest, validator, data, terms)
+
+    monkeypatch.setattr(utils, 'document_errors', counted)
+    return calls
+
+
+def use_result_cache(monkeypatch, **kwargs) -> LRUCache:
+    cache = LRUCache(**kwargs)
+    monkeypatch.setattr(utils, 'result_cache', cache)
+    return cache
+
+
+def test_a_resend_with_reordered_keys_is_answered_from_the_cache(client, context_url, validations, monkeypatch):
+    results = use_result_cache(monkeypatch, maxsize=16)
+    document = {'@context': context_url, 'data': {'name': 'a', 'value': 1}}
+    reordered = {'data': {'value': 1, 'name': 'a'}, '@context': context_url}
+
+    first = client.post('/api/validate', json=document)
+    second = client.post('/api/validate', json=reordered)
+
+    assert first.status_code == second.status_code == 200
+    assert first.get_json() == second.get_json() == {'isValid': 'True'}
+    assert (results.hits, results.misses) == (1, 1)
+    assert len(validations) == 1
+
+
+def test_a_cached_422_is_replayed_with_the_same_message_and_fields(client, context_url, validations, monkeypatch):
+    results = use_result_cache(monkeypatch, maxsize=16)
+    document = {'@context': context_url, 'data': {'value': 'x'}}
+
+    first = client.post('/api/validate', json=document)
+    second = client.post('/api/validate', json=document)
+
+    assert first.status_code == second.status_code == 422
+    assert first.get_json() == second.get_json()
+    assert len(first.get_json()['error']['fields']) == 2
+    assert results.hits == 1
+    assert len(validations) == 1
+
+
+def test_the_error_limit_is_part_of_the_key(client, context_url, validations, monkeypatch):
+    use_result_cache(monkeypatch, maxsize=16)
+    document = {'@context': context_url, 'data': {'value': 'x'}}
+
+    full = client.post('/api/validate', json=document)
+    limited = client.post('/api/validate?max_errors=1', json=document)
+
+    assert len(full.get_json()['error']['fields']) == 2
+    assert len(limited.get_json()['error']['fields']) == 1
+    assert len(validations) == 2
+
+
+def test_the_byte_budget_evicts_the_least_recently_used_results(client, context_url, validations, monkeypatch):
+    # an entry is sized 256 bytes plus its json, two valid results fit
+    results = use_result_cache(monkeypatch, maxsize=16, max_bytes=600)
+    documents = [{'@context': context_url, 'data': {'name': name}} for name in ('a', 'b', 'c')]
+
+    for document in documents:
+        assert client.post('/api/validate', json=document).status_code == 200
+
+    assert len(results) == 2
+    assert results.bytes <= 600
+    client.post('/api/validate', json=documents[2])
+    assert len(validations) == 3
+    client.post('/api/validate', json=documents[0])
+    assert len(validations) == 4
+
+
+def test_a_disabled_cache_validates_every_request(client, context_url, validations, monkeypatch):
+    results = use_result_cache(monkeypatch, maxsize=0)
+    document = {'@context': context_url, 'data': {'name': 'a'}}
+
+    client.post('/api/validate', json=document)
+    client.post('/api/validate', json=document)
+
+    assert len(validations) == 2
+    assert len(results) == 0
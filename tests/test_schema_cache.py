@@ -0,0 +1,100 @@
+import pytest
+
+from standards.api import utils
+from standards.api.cache import LRUCache, shape_fingerprint
+
+CONTEXT_URL = 'https://standards.oftrust.net/v2/Context/DataProductOutput/Sensor/'
+
+DOCUMENT = {
+    '@context': CONTEXT_URL,
+    'data': {'name': 'sensor', 'value': 1, 'ok': True, 'items': [{'id': 1}, {'id': 2}], 'none': None}
+}
+
+
+def test_values_do_not_change_the_fingerprint():
+    changed = {
+        '@context': 'other',
+        'data': {'name': 'other', 'value': 2, 'ok': False, 'items': [{'id': 3}, {'id': 4}, {'id': 5}], 'none': None}
+    }
+
+    assert shape_fingerprint(changed) == shape_fingerprint(DOCUMENT)
+
+
+@pytest.mark.parametrize('first, second', [
+    ({'a': 1, 'b': 's'}, {'b': 's', 'a': 1}),
+    ({'a': 1}, {'a': 1.0}),
+    ({'a': 1}, {'a': True}),
+    ({'a': 1}, {'a': '1'}),
+    ({'a': None}, {'a': {}}),
+    ({'a': []}, {'a': {}}),
+    ({'a': [1, 's']}, {'a': ['s', 1]}),
+    ({'a': [{'b': 1}]}, {'a': [{'b': 1}, {'c': 1}]}),
+    ({'a': {'b': 1}}, {'a': {'b': 1, 'c': 1}}),
+])
+def test_key_order_and_types_change_the_fingerprint(first, second):
+    assert shape_fingerprint(first) != shape_fingerprint(second)
+
+
+def test_array_elements_count_once_per_shape():
+    assert shape_fingerprint({'a': [{'b': 'x'}, {'b': 'y'}]}) == "{'a':[{'b':s}]}"
+    assert shape_fingerprint([1, 2, 's', 3]) == shape_fingerprint([1, 's'])
+
+
+@pytest.fixture
+def schemas(monkeypatch):
+    cache = LRUCache(maxsize=16)
+    monkeypatch.setattr(utils, 'schema_cache', cache)
+    return cache
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """Count the schemas actually generated, a cached schema is not built again."""
+    calls = []
+    build_schema = utils.build_schema
+
+    def counted(data):
+        calls.append(data)
+        return build_schema(data)
+
+    monkeypatch.setattr(utils, 'build_schema', counted)
+    return calls
+
+
+def test_a_value_only_change_is_answered_from_the_cache(schemas, builds):
+    changed = {'@context': CONTEXT_URL, 'data': {'name': 'x', 'value': 7, 'ok': False, 'items': [{'id': 9}], 'none': None}}
+
+    first = utils.generate_schema(DOCUMENT)
+    second = utils.generate_schema(changed)
+
+    assert second == first
+    assert second == utils.build_merged_schema([changed])
+    assert (schemas.hits, schemas.misses) == (1, 1)
+    assert len(builds) == 1
+
+
+@pytest.mark.parametrize('changed', [
+    {'data': DOCUMENT['data'], '@context': CONTEXT_URL},
+    {'@context': CONTEXT_URL, 'data': dict(DOCUMENT['data'], value=1.5)},
+    {'@context': CONTEXT_URL, 'data': dict(DOCUMENT['data'], value='1')},
+    {'@context': CONTEXT_URL, 'data': dict(DOCUMENT['data'], items=[{'id': '1'}])},
+    {'@context': CONTEXT_URL, 'data': dict(DOCUMENT['data'], extra=1)},
+    {'@context': CONTEXT_URL.replace('Sensor', 'Device'), 'data': DOCUMENT['data']},
+])
+def test_a_key_order_type_or_context_change_misses_the_cache(schemas, builds, changed):
+    utils.generate_schema(DOCUMENT)
+
+    schema = utils.generate_schema(changed)
+
+    assert schema == utils.build_merged_schema([changed])
+    assert schemas.hits == 0
+    assert len(builds) == 2
+
+
+def test_the_endpoint_serves_cached_schemas(client, schemas, builds):
+    first = client.post('/api/schema', json=DOCUMENT)
+    second = client.post('/api/schema', json=dict(DOCUMENT, data=dict(DOCUMENT['data'], name='other')))
+
+    assert first.status_code == second.status_code == 200
+    assert first.get_json() == second.get_json()
+    assert len(builds) == 1
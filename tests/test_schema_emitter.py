@@ -0,0 +1,106 @@
+import json
+import random
+
+import pytest
+
+from standards.api import codec
+from standards.api.genson import SchemaBuilder
+from standards.api.genson.utils import emit_schema, iter_schema_json, sorted_schema
+
+CONTEXT_URL = 'https://standards.oftrust.net/v2/Context/DataProductOutput/Sensor/'
+SCHEMA_ID = 'https://standards.oftrust.net/v2/Schema/DataProductOutput/Sensor'
+
+DOCUMENTS = [
+    {'@context': CONTEXT_URL, 'data': {}},
+    {'@context': CONTEXT_URL, '@type': 'Sensor', 'data': {'name': 'x', 'value': 1.5, 'ok': True, 'none': None}},
+    {'@context': CONTEXT_URL, 'data': {'items': [{'id': 1}, {'id': 2, 'extra': 'a'}], 'empty': []}},
+    {'@context': CONTEXT_URL, 'data': {'mixed': [1, 'a', {'b': 1}], 'nested': {'a': {'b': {'c': [[1]]}}}}},
+    # keyword names as properties
+    {'@context': CONTEXT_URL, 'data': {'properties': {'type': 'x', 'items': [1]}, 'title': 1, 'required': []}},
+]
+
+NAMES = ['name', 'idLocal', 'value', 'a', 'timestamp', 'location', 'properties', 'items', 'type', 'title']
+
+
+def random_value(rng, depth=0):
+    choice = rng.random()
+    if depth > 3 or choice < 0.4:
+        return rng.choice([1, 1.5, 'a', True, None, ''])
+    if choice < 0.75:
+        return {rng.choice(NAMES): random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))}
+    return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 3))]
+
+
+def reference_schema(builder) -> dict:
+    """The schema as generated before emit_schema: ``to_schema``, then ``$id`` by path and sorted keys."""
+    schema = builder.to_schema()
+    schema['properties']['@context']['const'] = CONTEXT_URL
+    schema = with_ids(schema, ())
+    schema['$id'] = SCHEMA_ID
+    return sorted_schema(schema)
+
+
+def with_ids(schema: dict, path: tuple) -> dict:
+    schema = dict(schema)
+    if isinstance(schema.get('properties'), dict):
+        schema['properties'] = {
+            name: with_ids(subschema, path + ('properties', name)) for name, subschema in schema['properties'].items()
+        }
+    if isinstance(schema.get('items'), dict):
+        schema['items'] = with_ids(schema['items'], path + ('items',))
+    if not path or path[-1] == 'properties':
+        # a property named "properties" is taken for the keyword, no $id and no sorting
+        return schema
+    schema['$id'] = f'#/{"/".join(path)}'
+    return sorted_schema(schema)
+
+
+def builder_for(*documents) -> SchemaBuilder:
+    builder = SchemaBuilder('http://json-schema.org/draft-06/schema#')
+    for document in documents:
+        builder.add_object(document)
+    return builder
+
+
+def emitted(builder) -> dict:
+    return emit_schema(builder, SCHEMA_ID, {('properties', '@context'): CONTEXT_URL})
+
+
+def random_documents(seed: int, count: int):
+    rng = random.Random(seed)
+    return [{'@context': CONTEXT_URL, 'data': random_value(rng)} for _ in range(count)]
+
+
+@pytest.mark.parametrize('document', DOCUMENTS + random_documents(0, 200))
+def test_emitted_schema_equals_the_generic_pipeline(document):
+    builder = builder_for(document)
+
+    # key order is part of the result
+    assert json.dumps(emitted(builder)) == json.dumps(reference_schema(builder))
+
+
+def test_merged_examples_equal_the_generic_pipeline():
+    builder = builder_for(*DOCUMENTS, *random_documents(1, 20))
+
+    assert json.dumps(emitted(builder)) == json.dumps(reference_schema(builder))
+
+
+@pytest.mark.parametrize('document', DOCUMENTS + random_documents(2, 50))
+def test_streamed_schema_equals_the_emitted_schema(document):
+    builder = builder_for(document)
+    chunks = list(iter_schema_json(builder, SCHEMA_ID, {('properties', '@context'): CONTEXT_URL},
+                                   lambda value: codec.dumps(value, separators=(',', ':')), chunk_size=64))
+
+    assert ''.join(chunks) == codec.dumps(emitted(builder), separators=(',', ':'))
+
+
+def test_schema_endpoint_streams_the_same_schema(client):
+    document = DOCUMENTS[2]
+
+    generated = client.post('/api/schema', json=document)
+    streamed = client.post('/api/schema?stream=true', json=document)
+    streamed_data = streamed.get_data()
+
+    assert generated.status_code == streamed.status_code == 200
+    assert streamed_data == generated.get_data()
+    assert json.loads(streamed_data) == emitted(builder_for(document))
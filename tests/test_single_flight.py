@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+from standards.api.cache import SingleFlight
+
+
+def run_concurrently(flight, fn, callers: int):
+    results = [None] * callers
+    errors = [None] * callers
+
+    def call(index):
+        try:
+            results[index] = flight.do('key', fn)
+        except Exception as e:
+            errors[index] = e
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return object()
+
+    leader = threading.Thread(target=lambda: flight.do('key', fetch))
+    leader.start()
+    started.wait(5)
+    threads, results, errors = run_concurrently(flight, fetch, 4)
+    # the followers are waiting for the leader
+    while flight.coalesced < 4:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads + [leader]:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert errors == [None] * 4
+    assert all(result is results[0] for result in results)
+
+
+def test_followers_re_raise_the_error_of_the_leader():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def fetch():
+        started.set()
+        release.wait(5)
+        raise ValueError('broken')
+
+    leader_errors = []
+
+    def lead():
+        try:
+            flight.do('key', fetch)
+        except ValueError as e:
+            leader_errors.append(e)
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    started.wait(5)
+    threads, results, errors = run_concurrently(flight, fetch, 2)
+    while flight.coalesced < 2:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads + [leader]:
+        thread.join(5)
+
+    assert errors == [leader_errors[0]] * 2
+
+
+def test_calls_after_completion_run_again():
+    flight = SingleFlight()
+    calls = []
+
+    assert flight.do('key', lambda: calls.append(1) or 'a') == 'a'
+    assert flight.do('key', lambda: calls.append(1) or 'b') == 'b'
+    with pytest.raises(KeyError):
+        flight.do('key', lambda: {}['missing'])
+
+    assert len(calls) == 2
+    assert flight.coalesced == 0
@@ -0,0 +1,88 @@
+import io
+import json
+
+import pytest
+
+from standards.api.stream import JSONStreamReader
+from tests.stub import serve_context
+
+VALUES = [0, -1, 1.25, -0.5, 1e16, 2.5e-8, -3E+2, 123456789, 1.0, 'a,b', '1.5', True, None, {'a': [1.5]}, []]
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        '@context': {'type': 'string'},
+        'data': {'type': 'array', 'items': {'type': 'number', 'maximum': 100}}
+    },
+    'required': ['@context', 'data']
+}
+
+
+class ChunkedStream(io.RawIOBase):
+    """Returns at most chunk_size bytes per read, whatever was asked for."""
+    def __init__(self, data: bytes, chunk_size: int):
+        self.data = data
+        self.chunk_size = chunk_size
+
+    def read(self, size=-1):
+        chunk, self.data = self.data[:self.chunk_size], self.data[self.chunk_size:]
+        return chunk
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 7, 64])
+@pytest.mark.parametrize('separator', [',', ', ', ' ,\n'])
+def test_elements_split_at_every_position_are_read_whole(chunk_size, separator):
+    body = ('[' + separator.join(json.dumps(value) for value in VALUES) + ']').encode()
+    for offset in range(chunk_size):
+        # shift the body so that each value is cut at every position once
+        reader = JSONStreamReader(ChunkedStream(b' ' * offset + body, chunk_size), 1024, chunk_size=chunk_size)
+
+        assert list(reader.elements()) == VALUES
+        reader.end()
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 4])
+def test_a_number_at_the_end_of_the_body_is_read_whole(chunk_size):
+    reader = JSONStreamReader(ChunkedStream(b'1.25e3', chunk_size), 1024, chunk_size=chunk_size)
+
+    assert reader.value() == 1.25e3
+
+
+@pytest.mark.parametrize('body', [b'[1.]', b'[1e]', b'[1,]', b'[1 2]', b'[01]'])
+def test_malformed_numbers_are_rejected(body):
+    reader = JSONStreamReader(ChunkedStream(body, 2), 1024, chunk_size=2)
+
+    with pytest.raises(ValueError):
+        list(reader.elements())
+
+
+def test_stream_endpoint_accepts_floats_cut_by_the_chunk_boundary(stub, client):
+    context_url = serve_context(stub, 'StreamFloats', SCHEMA, {'Cache-Control': 'max-age=60'})
+    document = {'@context': context_url, 'data': [1.25] * 20000}
+    body = json.dumps(document)
+
+    for shift in ('', ' '):
+        # one of the two bodies puts a chunk boundary inside a number
+        streamed = client.post('/api/validate/stream', data=shift + body, content_type='application/json')
+        assert streamed.status_code == 200
+    assert client.post('/api/validate', json=document).status_code == 200
+
+
+def test_stream_endpoint_reports_the_errors_of_validate(stub, client):
+    context_url = serve_context(stub, 'StreamErrors', SCHEMA, {'Cache-Control': 'max-age=60'})
+    document = {'@context': context_url, 'data': [1.5, 'a', 101, 2e2]}
+
+    streamed = client.post('/api/validate/stream', json=document)
+    validated = client.post('/api/validate', json=document)
+
+    assert streamed.status_code == validated.status_code == 422
+    assert streamed.get_json() == validated.get_json()
+
+
+def test_stream_endpoint_rejects_malformed_json(stub, client):
+    context_url = serve_context(stub, 'StreamMalformed', SCHEMA, {'Cache-Control': 'max-age=60'})
+
+    response = client.post('/api/validate/stream', data='{"@context": "%s", "data": [1.]}' % context_url,
+                           content_type='application/json')
+
+    assert response.status_code == 422
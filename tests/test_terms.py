@@ -0,0 +1,138 @@
+import json
+
+import pytest
+
+from standards import app
+from standards.api.terms import ContextTerms
+
+CONTEXT = {
+    '@context': {
+        '@version': 1.1,
+        '@vocab': 'https://standards.oftrust.net/v2/Vocabulary/',
+        '@schema': 'https://standards.oftrust.net/v2/Schema/Sensor',
+        'xsd': 'http://www.w3.org/2001/XMLSchema#',
+        'data': {'@id': 'pot:data', '@nest': None},
+        'name': {'@id': 'pot:name', '@nest': 'data'},
+        'value': {'@id': 'pot:value', '@nest': 'data'},
+        'items': {'@id': 'pot:items'},
+        'removed': None,
+    }
+}
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        '@context': {'type': 'string'},
+        'data': {'type': 'array', 'items': {'type': 'object', 'required': ['name']}}
+    },
+    'required': ['@context', 'data']
+}
+
+
+def messages(terms, document):
+    return sorted((error.message, list(error.path)) for error in terms.iter_errors(document))
+
+
+@pytest.fixture
+def terms():
+    return ContextTerms.from_context(CONTEXT, 'digest')
+
+
+def test_terms_of_the_context_are_accepted(terms):
+    document = {'@context': 'x', '@type': 'Sensor', 'data': {'name': 'a', 'value': 1, 'items': [{'items': []}]}}
+
+    assert messages(terms, document) == []
+
+
+def test_unknown_keys_are_reported_at_any_depth(terms):
+    document = {'unknown': 1, 'data': {'name': 'a', 'items': [{'other': 2}]}, 'removed': 3}
+
+    assert messages(terms, document) == [
+        ("'other' is not defined in the @context", ['data', 'items', 0, 'other']),
+        ("'removed' is not defined in the @context", ['removed']),
+        ("'unknown' is not defined in the @context", ['unknown']),
+    ]
+
+
+def test_keywords_and_iris_are_accepted_without_a_term(terms):
+    document = {'@id': 'x', 'xsd:string': 1, 'https://example.com/p': 2, 'data': {'pot:extra': 3}}
+
+    assert messages(terms, document) == []
+
+
+def test_nested_terms_must_be_under_their_nesting_property(terms):
+    document = {'name': 'a', 'data': {'items': {'value': 1}}}
+
+    assert messages(terms, document) == [
+        ("'name' must be nested under 'data'", ['name']),
+        ("'value' must be nested under 'data'", ['data', 'items', 'value']),
+    ]
+
+
+def test_list_elements_keep_the_nesting_property_of_the_list(terms):
+    assert messages(terms, {'data': [{'name': 'a'}, {'name': 'b'}]}) == []
+
+
+def test_nesting_property_is_a_term_without_a_definition():
+    terms = ContextTerms.from_context({'@context': {'name': {'@nest': 'data'}}})
+
+    assert terms.terms == frozenset({'name', 'data'})
+    assert terms.nests == {'name': 'data'}
+
+
+@pytest.mark.parametrize('document', [
+    {'@context': ['https://example.com/context.jsonld', {'name': 'pot:name'}]},
+    {'@context': 'https://example.com/context.jsonld'},
+    {'@context': None},
+    {},
+    [],
+    'text',
+])
+def test_contexts_that_are_not_inline_objects_have_no_terms(document):
+    assert ContextTerms.from_context(document) is None
+
+
+@pytest.fixture
+def term_check(stub, monkeypatch):
+    monkeypatch.setitem(app.config, 'TERM_CHECK', True)
+    stub.documents['/v2/Schema/Terms'] = (SCHEMA, {'Cache-Control': 'max-age=60'})
+    context = json.loads(json.dumps(CONTEXT))
+    context['@context']['@schema'] = stub.url('/v2/Schema/Terms')
+    stub.documents['/v2/Context/Terms/'] = (context, {'Cache-Control': 'max-age=60'})
+    return stub.url('/v2/Context/Terms/')
+
+
+def test_every_validation_endpoint_reports_unknown_terms(term_check, client):
+    document = {'@context': term_check, 'extra': 1, 'data': [{'name': 'a', 'unknown': 2}, {'value': 1}]}
+
+    validated = client.post('/api/validate', json=document)
+    batch = client.post('/api/validate/batch', json=[document])
+    ndjson = client.post('/api/validate/ndjson', data=json.dumps(document) + '\n',
+                         content_type='application/x-ndjson')
+    ndjson_data = ndjson.get_data(as_text=True)
+    streamed = client.post('/api/validate/stream', json=document)
+
+    assert validated.status_code == 422
+    body = validated.get_json()
+    assert set(body['error']['fields']) == {'extra', 'unknown', 'name'}
+    assert batch.get_json() == [body]
+    assert json.loads(ndjson_data) == body
+    assert streamed.status_code == 422
+    assert streamed.get_json() == body
+
+
+def test_stream_checks_terms_of_data_given_before_the_context(term_check, client):
+    document = {'data': [{'name': 'a', 'unknown': 2}], '@context': term_check}
+
+    streamed = client.post('/api/validate/stream', json=document)
+
+    assert streamed.get_json() == client.post('/api/validate', json=document).get_json()
+    assert 'unknown' in streamed.get_json()['error']['fields']
+
+
+def test_defined_terms_pass_every_validation_endpoint(term_check, client):
+    document = {'@context': term_check, 'data': [{'name': 'a', 'value': 1}]}
+
+    assert client.post('/api/validate', json=document).status_code == 200
+    assert client.post('/api/validate/batch', json=[document]).get_json() == [{'isValid': 'True'}]
+    assert client.post('/api/validate/stream', json=document).status_code == 200
@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from standards.api.cache import ResponseCache
+from standards.api.utils import make_request, response_cache
+from standards.api.warmup import warm_context
+from tests.stub import serve_context
+
+SCHEMA = {'type': 'object', 'properties': {'@context': {'type': 'string'}}}
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(request=make_request, maxsize=16)
+
+
+def test_refresh_renews_an_entry_expiring_within_the_margin(stub, cache):
+    stub.documents['/doc'] = ({'a': 1}, {'Cache-Control': 'max-age=60', 'ETag': '"v1"'})
+    pinned = cache.pin(stub.url('/doc'))
+    expires = pinned.expires
+
+    time.sleep(0.01)
+    refreshed = cache.refresh(stub.url('/doc'), margin=120)
+
+    hits = stub.hits('/doc')
+    assert len(hits) == 2
+    assert hits[1]['If-None-Match'] == '"v1"'
+    assert refreshed is pinned
+    assert refreshed.expires > expires
+    assert cache.revalidations == 1
+
+
+def test_refresh_leaves_an_entry_outside_the_margin(stub, cache):
+    stub.documents['/doc'] = ({'a': 1}, {'Cache-Control': 'max-age=60', 'ETag': '"v1"'})
+    pinned = cache.pin(stub.url('/doc'))
+
+    assert cache.refresh(stub.url('/doc'), margin=10) is pinned
+    assert len(stub.hits('/doc')) == 1
+
+
+def test_refresh_picks_up_a_changed_document(stub, cache):
+    stub.documents['/doc'] = ({'a': 1}, {'Cache-Control': 'max-age=60', 'ETag': '"v1"'})
+    cache.pin(stub.url('/doc'))
+    stub.documents['/doc'] = ({'a': 2}, {'Cache-Control': 'max-age=60', 'ETag': '"v2"'})
+
+    cache.refresh(stub.url('/doc'), margin=120)
+
+    assert cache.lookup(stub.url('/doc')).data == {'a': 2}
+
+
+def test_warm_context_renews_context_and_schema_before_expiry(stub):
+    context_url = serve_context(stub, 'Warm', SCHEMA, {'Cache-Control': 'max-age=60', 'ETag': '"v1"'})
+    schema_url = stub.url('/v2/Schema/Warm')
+    warm_context(context_url)
+    revalidations = response_cache.revalidations
+
+    warm_context(context_url, margin=120)
+
+    assert stub.hits('/v2/Context/Warm/')[-1]['If-None-Match'] == '"v1"'
+    assert stub.hits('/v2/Schema/Warm')[-1]['If-None-Match'] == '"v1"'
+    assert response_cache.revalidations == revalidations + 2
+    assert schema_url in response_cache.pinned()